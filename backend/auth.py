@@ -0,0 +1,56 @@
+import os
+import threading
+from dotenv import load_dotenv
+
+load_dotenv() # Load variables from .env
+
+# --- CONFIG: CALLER AUTHENTICATION ---
+# The Supabase project's JWT secret (Settings > API). With it, access tokens
+# are checked locally; without it, each one is checked with Supabase Auth.
+JWT_SECRET = os.environ.get("SUPABASE_JWT_SECRET")
+JWT_AUDIENCE = "authenticated"
+
+_client = None
+_client_lock = threading.Lock()
+
+def _supabase_client():
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                from supabase import create_client
+                _client = create_client(os.environ["SUPABASE_URL"], os.environ["SUPABASE_KEY"])
+    return _client
+
+def auth_enabled():
+    """Whether callers can be verified at all; routes that need a user are off otherwise."""
+    if JWT_SECRET:
+        return True
+    url = os.environ.get("SUPABASE_URL")
+    return bool(url and os.environ.get("SUPABASE_KEY") and not url.startswith("memory://"))
+
+def verified_user_id(authorization):
+    """
+    The Supabase user id behind an `Authorization: Bearer <access token>`
+    header, or None if the header is missing, the token doesn't verify or
+    has expired, or auth isn't configured.
+    """
+    if not authorization or not authorization.startswith("Bearer "):
+        return None
+    token = authorization[len("Bearer "):].strip()
+    if not token or not auth_enabled():
+        return None
+    if JWT_SECRET:
+        import jwt
+        try:
+            claims = jwt.decode(token, JWT_SECRET, algorithms=["HS256"], audience=JWT_AUDIENCE,
+                                options={"require": ["sub", "exp"]})
+        except jwt.InvalidTokenError:
+            return None
+        return claims["sub"]
+    try:
+        response = _supabase_client().auth.get_user(token)
+    except Exception as e:
+        print(f"[!] Could not verify access token: {e}")
+        return None
+    return response.user.id if response and response.user else None
@@ -0,0 +1,224 @@
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+from scan_executor import ScanCancelled
+from jobs import ShuttingDown
+
+# --- CONFIG: MULTI-TARGET BATCH SCANS ---
+BATCH_WORKERS = int(os.environ.get("SENTINEL_BATCH_WORKERS", 16))          # targets scanning at once, all batches
+DEEP_BATCH_WORKERS = int(os.environ.get("SENTINEL_BATCH_DEEP_WORKERS", 2)) # of those, browser-driven deep scans
+PER_HOST = int(os.environ.get("SENTINEL_BATCH_PER_HOST", 2))               # scans against one host at once
+MAX_TARGETS = int(os.environ.get("SENTINEL_BATCH_MAX_TARGETS", 5000))
+BATCH_TTL = float(os.environ.get("SENTINEL_BATCH_TTL", 24 * 3600))         # seconds a finished batch stays fetchable
+
+class BatchTarget:
+    def __init__(self, index, url):
+        self.index = index
+        self.url = url
+        self.host = (urlsplit(url).hostname or url).lower()
+        self.status = "queued"
+        self.started_at = None
+        self.finished_at = None
+        self.result = None
+        self.error = None
+
+    def to_dict(self):
+        summary = self.result.get("summary") if isinstance(self.result, dict) else None
+        return {
+            "index": self.index,
+            "url": self.url,
+            "status": self.status,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "summary": summary,
+            "error": self.error,
+        }
+
+class Batch:
+    def __init__(self, mode, urls):
+        self.id = uuid.uuid4().hex
+        self.mode = mode
+        self.created_at = time.time()
+        self.finished_at = None
+        self.targets = [BatchTarget(i, url) for i, url in enumerate(urls)]
+        self.pending = deque(self.targets)
+        self.cancel_event = threading.Event()
+
+    @property
+    def finished(self):
+        return all(t.status in ("done", "failed", "cancelled") for t in self.targets)
+
+    def progress(self):
+        statuses = [t.status for t in self.targets]
+        counts = {s: statuses.count(s) for s in ("queued", "running", "done", "failed", "cancelled")}
+        return {"total": len(self.targets), **counts}
+
+    def to_dict(self, offset=0, limit=None):
+        targets = self.targets[offset:None if limit is None else offset + limit]
+        return {
+            "batch_id": self.id,
+            "mode": self.mode,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "progress": self.progress(),
+            "targets": [t.to_dict() for t in targets],
+        }
+
+class BatchScheduler:
+    """
+    Runs every batch's targets on one shared pool. A target only starts when
+    the pool has a free slot and its host is below PER_HOST, so one large
+    inventory never hammers a single host and batches share capacity fairly.
+    """
+    def __init__(self, max_running=BATCH_WORKERS, max_deep=DEEP_BATCH_WORKERS, per_host=PER_HOST, ttl=BATCH_TTL):
+        self.max_running = max_running
+        self.max_deep = max_deep
+        self.per_host = per_host
+        self.ttl = ttl
+        self._pool = ThreadPoolExecutor(max_workers=max_running, thread_name_prefix="sentinel-batch")
+        self._batches = {}
+        self._order = deque()  # batch ids with pending targets, served round-robin
+        self._running = 0
+        self._running_deep = 0
+        self._host_load = {}
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def submit(self, mode, urls, func):
+        """
+        Schedules func(url, cancel_event) for every url; its return value is
+        the target's result. Raises ValueError for an empty or oversized
+        batch and ShuttingDown once shutdown() has been called.
+        """
+        if not urls:
+            raise ValueError("No valid targets provided")
+        if len(urls) > MAX_TARGETS:
+            raise ValueError(f"At most {MAX_TARGETS} targets per batch")
+        batch = Batch(mode, urls)
+        with self._lock:
+            if self._closed:
+                raise ShuttingDown("Server is shutting down")
+            self._prune()
+            self._batches[batch.id] = (batch, func)
+            self._order.append(batch.id)
+            self._dispatch()
+            self._mark_finished(batch)  # nothing left to schedule means no worker will ever finish it
+        return batch
+
+    def get(self, batch_id):
+        with self._lock:
+            entry = self._batches.get(batch_id)
+        return entry[0] if entry else None
+
+    def cancel(self, batch_id):
+        """Queued targets never start; running deep scans stop at their next checkpoint."""
+        with self._lock:
+            entry = self._batches.get(batch_id)
+            if entry is None:
+                return None
+            batch = entry[0]
+            batch.cancel_event.set()
+            self._drop_pending(batch)
+        return batch
+
+    def _drop_pending(self, batch):
+        # Caller holds self._lock
+        while batch.pending:
+            target = batch.pending.popleft()
+            target.status = "cancelled"
+            target.finished_at = time.time()
+        self._mark_finished(batch)
+
+    def shutdown(self, timeout):
+        """
+        Stops dispatching and drops every batch's queued targets. Running
+        targets get `timeout` seconds to finish, then are cancelled.
+        """
+        with self._lock:
+            self._closed = True
+            batches = [batch for batch, _ in self._batches.values()]
+            for batch in batches:
+                self._drop_pending(batch)
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self._lock:
+                if not self._running:
+                    break
+            time.sleep(0.1)
+        for batch in batches:
+            batch.cancel_event.set()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self):
+        """Targets across all batches: waiting for a slot, and scanning now."""
+        with self._lock:
+            queued = sum(len(batch.pending) for batch, _ in self._batches.values())
+            return {"queued": queued, "running": self._running}
+
+    def _dispatch(self):
+        # Caller holds self._lock
+        idle_rounds = 0
+        while self._order and self._running < self.max_running and idle_rounds < len(self._order):
+            batch_id = self._order[0]
+            self._order.rotate(-1)
+            batch, func = self._batches[batch_id]
+            target = self._next_target(batch)
+            if target is None:
+                idle_rounds += 1
+                if not batch.pending:
+                    self._order.remove(batch_id)
+                continue
+            idle_rounds = 0
+            target.status = "running"
+            target.started_at = time.time()
+            self._running += 1
+            self._running_deep += batch.mode == "deep"
+            self._host_load[target.host] = self._host_load.get(target.host, 0) + 1
+            self._pool.submit(self._execute, batch, target, func)
+
+    def _next_target(self, batch):
+        """First pending target whose host has room, or None."""
+        if batch.mode == "deep" and self._running_deep >= self.max_deep:
+            return None
+        for i, target in enumerate(batch.pending):
+            if self._host_load.get(target.host, 0) < self.per_host:
+                del batch.pending[i]
+                return target
+        return None
+
+    def _execute(self, batch, target, func):
+        try:
+            target.result = func(target.url, batch.cancel_event)
+            target.status = "done"
+        except ScanCancelled:
+            target.status = "cancelled"
+        except Exception as e:
+            print(f"[!] Batch {batch.id} target {target.url} failed: {e}")
+            target.error = str(e)
+            target.status = "failed"
+        finally:
+            target.finished_at = time.time()
+            with self._lock:
+                self._running -= 1
+                self._running_deep -= batch.mode == "deep"
+                self._host_load[target.host] -= 1
+                if not self._host_load[target.host]:
+                    del self._host_load[target.host]
+                self._mark_finished(batch)
+                self._dispatch()
+
+    def _mark_finished(self, batch):
+        if batch.finished_at is None and batch.finished:
+            batch.finished_at = time.time()
+            print(f"[+] Batch {batch.id} finished: {batch.progress()}")
+
+    def _prune(self):
+        cutoff = time.time() - self.ttl
+        for batch_id in [b.id for b, _ in self._batches.values() if b.finished_at and b.finished_at < cutoff]:
+            del self._batches[batch_id]
+
+batch_scans = BatchScheduler()
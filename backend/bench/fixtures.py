@@ -0,0 +1,140 @@
+import logging
+import random
+import threading
+import time
+from flask import Flask, Response, request
+from werkzeug.serving import make_server
+
+# --- CONFIG: FIXTURE DEFAULTS (override per run via build_fixture_app kwargs) ---
+DEFAULTS = {
+    "forms": 200,              # forms on /forms; one field of one form is injectable
+    "vulnerable_form": 150,
+    "bundle_mb": 3,            # size of /static/vendor.js
+    "link_pages": 500,         # nodes in the /graph link graph
+    "links_per_page": 4,
+    "jitter_ms": (0, 20),      # per-request delay range on /graph and /slow
+    "slow_ms": 200,            # fixed delay on /slow
+    "secrets": ["/.env", "/.git/config", "/backup.sql"],  # real files behind the soft-404 handler
+}
+
+class RequestCounter:
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def hit(self):
+        with self._lock:
+            self.count += 1
+
+    def reset(self):
+        with self._lock:
+            count, self.count = self.count, 0
+        return count
+
+def build_fixture_app(**overrides):
+    """
+    One Flask app serving every benchmark scenario: a many-form page, a
+    multi-megabyte JS bundle, slow and jittery endpoints, a soft-404
+    catch-all and a large same-origin link graph.
+    """
+    config = {**DEFAULTS, **overrides}
+    app = Flask("sentinel_bench")
+    app.counter = RequestCounter()
+    app.config["BENCH"] = config
+    rng = random.Random(1234)
+    bundle = _make_bundle(config["bundle_mb"])
+
+    def jitter():
+        low, high = config["jitter_ms"]
+        if high:
+            time.sleep(rng.uniform(low, high) / 1000)
+
+    @app.before_request
+    def count():
+        app.counter.hit()
+
+    @app.route("/forms")
+    def forms():
+        parts = ["<html><body>"]
+        for i in range(config["forms"]):
+            parts.append(f'<form action="/submit/{i}" method="post"><input name="a"><input name="b" value="x">'
+                         f'<input type="hidden" name="csrf" value="t{i}"><input type="submit"></form>')
+        parts.append("</body></html>")
+        return "".join(parts)
+
+    @app.route("/submit/<int:i>", methods=["GET", "POST"])
+    def submit(i):
+        if i == config["vulnerable_form"] and "'" in request.values.get("b", ""):
+            return "You have an error in your SQL syntax; check the manual", 500
+        return "ok"
+
+    @app.route("/bundle")
+    def bundle_page():
+        return '<html><script src="/static/vendor.js"></script><script src="/static/app.js"></script></html>'
+
+    @app.route("/static/vendor.js")
+    def vendor():
+        return Response(bundle, mimetype="application/javascript", headers={"ETag": '"vendor-1"'})
+
+    @app.route("/static/app.js")
+    def app_js():
+        return Response('fetch("/api/internal/users");fetch("/v1/secret/keys");', mimetype="application/javascript")
+
+    @app.route("/slow")
+    def slow():
+        time.sleep(config["slow_ms"] / 1000)
+        jitter()
+        return "<html>slow</html>"
+
+    @app.route("/graph/<int:i>")
+    def graph(i):
+        jitter()
+        n = config["link_pages"]
+        links = "".join(f'<a href="/graph/{(i * config["links_per_page"] + k) % n}">p</a>'
+                        for k in range(1, config["links_per_page"] + 1))
+        return f"<html><body>page {i} {links}</body></html>"
+
+    @app.route("/", defaults={"path": ""})
+    @app.route("/<path:path>")
+    def catch_all(path):
+        # Soft-404: everything unknown is a 200 that echoes the path
+        if "/" + path in config["secrets"]:
+            return f"SECRET_KEY=bench-{path}\nDB_PASSWORD=hunter2\n"
+        return f"<html><body><h1>Page not found</h1><p>No page at /{path}</p></body></html>"
+
+    return app
+
+def _make_bundle(megabytes):
+    # Minified-looking filler with a few endpoint literals spread through it
+    chunk = "function a(b){return b&&b.c?b.c(d):e}var f=[1,2,3].map(function(g){return g*2});"
+    body = []
+    size = 0
+    i = 0
+    while size < megabytes * 1024 * 1024:
+        if i % 5000 == 0:
+            body.append(f'fetch("/api/vendor/v{i}");')
+        body.append(chunk)
+        size += len(chunk)
+        i += 1
+    return "".join(body)
+
+class FixtureServer:
+    """Runs a fixture app on a free localhost port in a background thread."""
+    def __init__(self, **overrides):
+        self.app = build_fixture_app(**overrides)
+        logging.getLogger("werkzeug").setLevel(logging.ERROR)  # one access-log line per probe drowns the results
+        self._server = make_server("127.0.0.1", 0, self.app, threaded=True)
+        self.port = self._server.server_port
+        self.url = f"http://127.0.0.1:{self.port}"
+        self._thread = threading.Thread(target=self._server.serve_forever, name="sentinel-bench-fixture", daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+
+    @property
+    def counter(self):
+        return self.app.counter
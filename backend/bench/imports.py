@@ -0,0 +1,88 @@
+"""
+Cold-start cost of the backend: how long importing each module takes in a
+fresh interpreter, and which dependencies it spends that time on.
+
+    python bench/imports.py                      # every backend module
+    python bench/imports.py server --top 15      # one module, its 15 slowest imports
+    python bench/imports.py --output bench/imports.json
+"""
+import argparse
+import glob
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Nothing started as a side effect of importing server may skew the numbers
+IMPORT_ENV = {"SENTINEL_WARM_BROWSERS": "0", "SENTINEL_STORAGE": "memory"}
+
+def backend_modules():
+    return sorted(os.path.splitext(os.path.basename(path))[0] for path in glob.glob(os.path.join(BACKEND_DIR, "*.py")))
+
+def import_profile(module):
+    """
+    Imports `module` once in a fresh interpreter under -X importtime.
+    Returns {imported module: (self_us, cumulative_us)}.
+    """
+    env = {**os.environ, **IMPORT_ENV, "PYTHONPATH": BACKEND_DIR}
+    with tempfile.TemporaryDirectory(prefix="sentinel-import-") as cwd:
+        proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                              cwd=cwd, env=env, capture_output=True, text=True, timeout=120)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"import {module} failed")
+    timings = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        timings[name.strip()] = (int(self_us), int(cumulative_us))
+    return timings
+
+def measure_import(module, repeat=5, top=10):
+    """Median cold import time of `module` and its `top` slowest dependencies, in ms."""
+    runs = [import_profile(module) for _ in range(repeat)]
+    total = statistics.median(run[module][1] for run in runs) / 1000
+    dependencies = {}
+    for run in runs:
+        for name, (_, cumulative) in run.items():
+            if name != module:
+                dependencies.setdefault(name, []).append(cumulative)
+    slowest = sorted(((statistics.median(v) / 1000, name) for name, v in dependencies.items()), reverse=True)[:top]
+    return {
+        "import_ms": round(total, 1),
+        "modules_loaded": round(statistics.median(len(run) for run in runs)),
+        "slowest": [{"module": name, "cumulative_ms": round(ms, 1)} for ms, name in slowest],
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sentinel import-time benchmark")
+    parser.add_argument("modules", nargs="*", help="backend modules to measure (default: all)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="slowest dependencies listed per module")
+    parser.add_argument("--output", help="write results JSON here (default: stdout)")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for module in args.modules or backend_modules():
+        try:
+            results[module] = measure_import(module, args.repeat, args.top)
+        except Exception as e:
+            results[module] = {"error": str(e)}
+            print(f"[!] {module}: {e}", file=sys.stderr)
+            continue
+        print(f"[+] {module}: {results[module]['import_ms']} ms", file=sys.stderr)
+
+    text = json.dumps(results, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,270 @@
+"""
+Scanner performance suite. Starts the local fixture farm, runs each module
+against it, and writes machine-readable results; with --baseline it also
+fails (exit 1) when a metric regresses past the tolerance.
+
+    python bench/run.py --output bench/results.json --baseline bench/baseline.json
+    python bench/run.py --modules sqli shadow_apis --repeat 3
+    python bench/run.py --update-baseline
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+# Keep scan history out of any real backend while benchmarking
+os.environ.setdefault("SENTINEL_STORAGE", "memory")
+
+from bench.fixtures import FixtureServer  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+DEFAULT_TOLERANCE = 0.25     # relative slack before a metric counts as a regression
+TIME_FLOOR_SECONDS = 0.05    # ignore timing differences smaller than this (scheduler noise)
+MEMORY_FLOOR_KB = 10240      # ignore peak-memory differences smaller than this (GC timing across worker threads)
+
+# metric -> True if bigger is worse
+COMPARED_METRICS = {
+    "p50_s": True,
+    "p95_s": True,
+    "requests": True,
+    "peak_mem_kb": True,
+    "throughput_rps": False,
+}
+
+class Skip(Exception):
+    """A module that can't run here (e.g. no Chromium), reported as skipped."""
+
+# --- MODULE SCENARIOS ---
+# Each returns a zero-argument callable doing one full run against the fixture.
+
+def bench_sqli(fixture):
+    from scanner_logic import scan_sql_injection
+    url = fixture.url + "/forms"
+
+    def run():
+        assert scan_sql_injection(url), "SQLi fixture finding was missed"
+    return run
+
+def bench_shadow_apis(fixture):
+    import js_analysis
+    from scanner_logic import scan_shadow_apis
+    url = fixture.url + "/bundle"
+
+    def run():
+        # Measure the cold path: forget bundles analysed by earlier repeats
+        js_analysis._endpoints_by_digest = js_analysis._LRU(js_analysis.CACHE_ENTRIES)
+        js_analysis._validators_by_url = js_analysis._LRU(js_analysis.CACHE_ENTRIES)
+        assert scan_shadow_apis(url), "shadow API fixture endpoints were missed"
+    return run
+
+def bench_ports(fixture):
+    from port_scanner import scan_ports
+
+    def run():
+        scan_ports(fixture.url, profile="top1000")
+    return run
+
+def bench_sensitive_files(fixture):
+    from deep_scanner import scan_sensitive_files
+    wordlist = tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False)
+    with wordlist:
+        for i in range(500):
+            wordlist.write(f"/bench-missing-{i}\n")
+        for path in fixture.app.config["BENCH"]["secrets"]:
+            wordlist.write(path + "\n")
+
+    def run():
+        found = scan_sensitive_files(fixture.url, wordlist=wordlist.name)
+        assert len(found) == len(fixture.app.config["BENCH"]["secrets"]), f"expected only the secrets, got {len(found)}"
+    return run
+
+def bench_crawl(fixture):
+    from crawler import crawl
+    from page_cache import PageCache
+
+    def run():
+        pages = sum(1 for _ in crawl(fixture.url + "/graph/0", PageCache(), max_depth=10, max_pages=300))
+        assert pages == 300, f"crawled {pages} pages"
+    return run
+
+def bench_playwright(fixture):
+    from browser_pool import get_browser_pool
+    try:
+        get_browser_pool().start()
+    except Exception as e:
+        raise Skip(f"browser unavailable: {str(e).splitlines()[0]}")
+    from deep_scanner import scan_active_playwright
+    url = fixture.url + "/forms"
+
+    def run():
+        scan_active_playwright(url)
+    return run
+
+def bench_report(fixture):
+    from reporter import generate_report
+    report = {
+        "target": fixture.url,
+        "summary": {"high": 40, "medium": 80, "low": 80},
+        "financial_risk_total": 123456.0,
+        "vulnerabilities": [
+            {"type": "XSS", "details": f"Reflected XSS on {fixture.url}/search?q={i}", "severity": ["High", "Medium", "Low"][i % 3],
+             "fix": "Escape all user inputs before rendering.\n" * 4, "cvss": 6.1, "est_cost": 11500.0}
+            for i in range(200)
+        ],
+    }
+    out_dir = tempfile.mkdtemp(prefix="sentinel-bench-")
+
+    def run():
+        generate_report(report, "technical", output_path=os.path.join(out_dir, "report.pdf"))
+    return run
+
+def bench_startup(fixture):
+    from bench.imports import import_profile
+
+    def run():
+        # Fresh interpreter importing server, as a newly scaled-up worker does
+        import_profile("server")
+    return run
+
+MODULES = {
+    "sqli": bench_sqli,                     # scan_sql_injection, 200-form page
+    "shadow_apis": bench_shadow_apis,       # scan_shadow_apis, multi-MB bundle
+    "ports": bench_ports,                   # scan_ports, top1000 profile
+    "sensitive_files": bench_sensitive_files,  # scan_sensitive_files, soft-404 host
+    "crawl": bench_crawl,                   # crawler, jittery 500-node link graph
+    "playwright": bench_playwright,         # scan_active_playwright
+    "report": bench_report,                 # generate_report, 200 findings
+    "startup": bench_startup,               # cold `import server` (see bench/imports.py for the breakdown)
+}
+
+# --- MEASUREMENT ---
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    k = (len(ordered) - 1) * pct / 100
+    low = int(k)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (k - low)
+
+def measure(name, fixture, repeat):
+    try:
+        run = MODULES[name](fixture)
+    except Skip as e:
+        return {"status": "skipped", "reason": str(e)}
+
+    run()  # warm-up: imports, pools, keep-alive sockets
+    fixture.counter.reset()
+    durations = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        try:
+            run()
+        except Exception as e:
+            return {"status": "failed", "reason": f"{type(e).__name__}: {e}"}
+        durations.append(time.perf_counter() - started)
+    requests = fixture.counter.reset() / repeat
+
+    # Peak memory comes from one extra run of its own: tracemalloc hooks every
+    # allocation, which would otherwise slow down the timed runs above
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+    except Exception as e:
+        return {"status": "failed", "reason": f"{type(e).__name__}: {e}"}
+    finally:
+        tracemalloc.stop()
+    fixture.counter.reset()
+
+    total = sum(durations)
+    return {
+        "status": "ok",
+        "runs": repeat,
+        "p50_s": round(percentile(durations, 50), 4),
+        "p95_s": round(percentile(durations, 95), 4),
+        "mean_s": round(total / repeat, 4),
+        "requests": round(requests, 1),
+        "throughput_rps": round(requests * repeat / total, 1) if total else None,
+        "peak_mem_kb": round(peak / 1024),
+    }
+
+def compare(results, baseline, tolerance):
+    """Returns a list of human-readable regressions versus the baseline."""
+    regressions = []
+    for name, current in results["modules"].items():
+        previous = baseline.get("modules", {}).get(name)
+        if current.get("status") != "ok" or not previous or previous.get("status") != "ok":
+            continue
+        for metric, bigger_is_worse in COMPARED_METRICS.items():
+            now, then = current.get(metric), previous.get(metric)
+            if now is None or not then:
+                continue
+            change = (now - then) / then
+            if metric.endswith("_s") and abs(now - then) < TIME_FLOOR_SECONDS:
+                continue
+            if metric == "peak_mem_kb" and abs(now - then) < MEMORY_FLOOR_KB:
+                continue
+            if (bigger_is_worse and change > tolerance) or (not bigger_is_worse and change < -tolerance):
+                regressions.append(f"{name}.{metric}: {then} -> {now} ({change:+.0%})")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sentinel scanner benchmarks")
+    parser.add_argument("--modules", nargs="+", choices=sorted(MODULES), default=sorted(MODULES))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="write results JSON here (default: stdout)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--update-baseline", action="store_true", help="store these results as the new baseline")
+    args = parser.parse_args(argv)
+
+    results = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+        },
+        "modules": {},
+    }
+    with FixtureServer() as fixture:
+        for name in args.modules:
+            print(f"[*] Benchmarking {name}...", file=sys.stderr)
+            results["modules"][name] = measure(name, fixture, args.repeat)
+            print(f"[+] {name}: {json.dumps(results['modules'][name])}", file=sys.stderr)
+
+    text = json.dumps(results, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            f.write(text + "\n")
+        print(f"[+] Baseline written to {args.baseline}", file=sys.stderr)
+        return 0
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"[!] Regression: {line}", file=sys.stderr)
+        if regressions:
+            return 1
+        print("[+] No regressions against baseline", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,191 @@
+import asyncio
+import atexit
+import concurrent.futures
+import contextvars
+import os
+import threading
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# --- CONFIG: WARM BROWSER POOL ---
+POOL_SIZE = int(os.environ.get("SENTINEL_BROWSERS", 1))               # Chromium processes kept running
+MAX_CONTEXTS = int(os.environ.get("SENTINEL_MAX_CONTEXTS", 4))        # scans inside browsers at once
+RECYCLE_AFTER_USES = int(os.environ.get("SENTINEL_BROWSER_RECYCLE_USES", 50))
+RECYCLE_MEMORY_MB = int(os.environ.get("SENTINEL_BROWSER_RECYCLE_MB", 1024))  # needs psutil
+SCAN_TIMEOUT = float(os.environ.get("SENTINEL_BROWSER_SCAN_TIMEOUT", 300))
+USER_AGENT = "Sentinel-Security-Bot/2.0"
+
+class _Slot:
+    def __init__(self, browser):
+        self.browser = browser
+        self.uses = 0
+        self.active = 0
+        self.retiring = False
+
+class BrowserPool:
+    """
+    Long-lived Chromium processes owned by one background event loop.
+    Scans borrow a fresh, isolated BrowserContext instead of paying for a
+    browser launch, and browsers are replaced after RECYCLE_AFTER_USES
+    contexts, when they grow past RECYCLE_MEMORY_MB, or if they crash.
+    """
+    def __init__(self, size=POOL_SIZE, max_contexts=MAX_CONTEXTS):
+        self.size = size
+        self.max_contexts = max_contexts
+        self._loop = None
+        self._thread = None
+        self._playwright = None
+        self._slots = []
+        self._context_limit = None
+        self._started = False
+        self._start_lock = threading.Lock()
+
+    # --- LIFECYCLE (called from any thread) ---
+    def start(self):
+        """Launches the browsers once; concurrent callers wait for the same launch."""
+        if self._started:
+            return
+        with self._start_lock:
+            if self._started:
+                return
+            if self._thread is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name="sentinel-browsers", daemon=True)
+                self._thread.start()
+            # A failed launch is retried by the next caller
+            asyncio.run_coroutine_threadsafe(self._launch_all(), self._loop).result()
+            self._started = True
+
+    def shutdown(self):
+        if self._loop is None or not self._loop.is_running():
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._close_all(), self._loop).result(timeout=10)
+        except Exception as e:
+            print(f"[!] Browser pool shutdown error: {e}")
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+    def run(self, scan, timeout=SCAN_TIMEOUT):
+        """
+        Runs `scan(context)`, an async function, inside a new BrowserContext
+        and returns its result. Blocks the calling thread until it finishes,
+        or for `timeout` seconds, after which the scan is cancelled.
+        """
+        self.start()
+        future = asyncio.run_coroutine_threadsafe(self._run_in(contextvars.copy_context(), scan), self._loop)
+        try:
+            return future.result(timeout=timeout)
+        except concurrent.futures.TimeoutError:
+            # Tear the task down so its context closes and its slot frees up
+            future.cancel()
+            raise
+
+    @property
+    def active_contexts(self):
+        return sum(slot.active for slot in self._slots)
+
+    # --- EVENT LOOP SIDE ---
+    async def _launch_all(self):
+        from playwright.async_api import async_playwright
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+        self._context_limit = asyncio.Semaphore(self.max_contexts)
+        self._slots = [_Slot(await self._launch()) for _ in range(self.size)]
+        print(f"[*] Browser pool ready ({self.size} Chromium, {self.max_contexts} contexts max)")
+
+    async def _launch(self):
+        # Launch optimized Chromium
+        return await self._playwright.chromium.launch(headless=True)
+
+    async def _close_all(self):
+        for slot in self._slots:
+            try: await slot.browser.close()
+            except Exception: pass
+        if self._playwright:
+            await self._playwright.stop()
+
+    async def _run_in(self, context, scan):
+        # Run the scan in the caller's contextvars rather than the loop thread's
+        return await asyncio.get_running_loop().create_task(self._run(scan), context=context)
+
+    async def _run(self, scan):
+        async with self._context_limit:
+            slot = await self._checkout()
+            try:
+                context = await slot.browser.new_context(user_agent=USER_AGENT)
+                try:
+                    return await scan(context)
+                finally:
+                    try: await context.close()
+                    except Exception: pass
+            finally:
+                slot.active -= 1
+                try:
+                    await self._maybe_recycle(slot)
+                except Exception as e:
+                    print(f"[!] Browser recycle failed: {e}")
+
+    async def _checkout(self):
+        # Health check: replace any browser that has crashed or disconnected
+        for i, slot in enumerate(self._slots):
+            if not slot.browser.is_connected() and slot.active == 0:
+                print("[!] Browser disconnected, relaunching")
+                self._slots[i] = _Slot(await self._launch())
+
+        candidates = [s for s in self._slots if not s.retiring and s.browser.is_connected()]
+        if not candidates:
+            slot = _Slot(await self._launch())
+            self._slots.append(slot)
+            candidates = [slot]
+
+        slot = min(candidates, key=lambda s: s.active)
+        slot.active += 1
+        slot.uses += 1
+        return slot
+
+    async def _maybe_recycle(self, slot):
+        if not slot.retiring and (slot.uses >= RECYCLE_AFTER_USES or self._over_memory()):
+            slot.retiring = True
+        if slot.retiring and slot.active == 0 and slot in self._slots:
+            self._slots.remove(slot)
+            self._slots.append(_Slot(await self._launch()))
+            try: await slot.browser.close()
+            except Exception: pass
+
+    def _over_memory(self):
+        if psutil is None or not self._slots:
+            return False
+        try:
+            children = psutil.Process().children(recursive=True)
+            rss = sum(c.memory_info().rss for c in children if "chrom" in c.name().lower() or "headless" in c.name().lower())
+        except Exception:
+            return False
+        return rss / len(self._slots) > RECYCLE_MEMORY_MB * 1024 * 1024
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_browser_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = BrowserPool()
+                atexit.register(_pool.shutdown)
+    return _pool
+
+def active_contexts():
+    """Browser contexts in use right now; 0 when the pool was never started."""
+    return _pool.active_contexts if _pool is not None else 0
+
+def warm_browser_pool():
+    """Starts Chromium in the background so the first deep scan finds it ready."""
+    def _warm():
+        try:
+            get_browser_pool().start()
+        except Exception as e:
+            print(f"[!] Browser pool failed to start: {e}")
+    threading.Thread(target=_warm, name="sentinel-browser-warmup", daemon=True).start()
@@ -0,0 +1,148 @@
+import contextvars
+import os
+import posixpath
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from urllib.parse import urljoin, urlsplit, urlunsplit, parse_qsl, urlencode
+from page_cache import fetch_document
+from scan_executor import check_cancelled
+
+# --- CONFIG: SAME-ORIGIN CRAWLER ---
+CRAWL_WORKERS = int(os.environ.get("SENTINEL_CRAWL_WORKERS", 16))  # shared by all crawls
+MAX_DEPTH = int(os.environ.get("SENTINEL_CRAWL_DEPTH", 3))          # link hops from the start page
+MAX_PAGES = int(os.environ.get("SENTINEL_CRAWL_PAGES", 200))        # page budget per crawl
+PER_HOST = int(os.environ.get("SENTINEL_CRAWL_PER_HOST", 8))        # concurrent fetches per host
+FETCH_TIMEOUT = 5
+
+# Links to these are never HTML, so they aren't worth a request
+SKIP_EXTENSIONS = {
+    ".png", ".jpg", ".jpeg", ".gif", ".svg", ".ico", ".webp", ".bmp",
+    ".css", ".js", ".map", ".woff", ".woff2", ".ttf", ".eot",
+    ".pdf", ".zip", ".gz", ".tar", ".rar", ".7z", ".exe", ".dmg",
+    ".mp3", ".mp4", ".avi", ".mov", ".webm", ".doc", ".docx", ".xls", ".xlsx",
+}
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+_pool = ThreadPoolExecutor(max_workers=CRAWL_WORKERS, thread_name_prefix="sentinel-crawl")
+
+def normalize_url(url):
+    """
+    Canonical form used for de-duplication: lowercase scheme and host,
+    default port dropped, dot segments resolved, query sorted, fragment gone.
+    Returns None for anything that isn't http(s).
+    """
+    try:
+        parts = urlsplit(url.strip())
+        port = parts.port
+    except ValueError:
+        return None
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS or not parts.hostname:
+        return None
+    netloc = parts.hostname.lower()
+    if port and port != DEFAULT_PORTS[scheme]:
+        netloc = f"{netloc}:{port}"
+    path = parts.path or "/"
+    if "/." in path:
+        trailing = path.endswith("/")
+        path = posixpath.normpath(path) + ("/" if trailing and path != "/" else "")
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, netloc, path, query, ""))
+
+def origin(url):
+    parts = urlsplit(url)
+    return parts.scheme, parts.netloc
+
+def is_crawlable(url):
+    return posixpath.splitext(urlsplit(url).path)[1].lower() not in SKIP_EXTENSIONS
+
+class Page:
+    def __init__(self, index, url, depth, doc):
+        self.index = index  # discovery order, for stable report ordering
+        self.url = url
+        self.depth = depth
+        self.doc = doc
+
+class Frontier:
+    """FIFO of (url, depth) to fetch; every URL is admitted at most once."""
+    def __init__(self, scope):
+        self.scope = scope
+        self.seen = set()
+        self._queue = deque()
+
+    def add(self, url, depth):
+        url = normalize_url(url)
+        if url is None or url in self.seen or origin(url) != self.scope or not is_crawlable(url):
+            return False
+        self.seen.add(url)
+        self._queue.append((url, depth))
+        return True
+
+    def pop_for(self, can_fetch):
+        """Removes and returns the first entry whose host can take another request."""
+        for i, (url, depth) in enumerate(self._queue):
+            if can_fetch(url):
+                del self._queue[i]
+                return url, depth
+        return None
+
+    def __len__(self):
+        return len(self._queue)
+
+def crawl(start_url, cache=None, max_depth=MAX_DEPTH, max_pages=MAX_PAGES, per_host=PER_HOST, cancel_event=None):
+    """
+    Breadth-first, same-origin crawl from start_url (or the origin it
+    redirects to). Yields a Page for every
+    HTML page fetched, as soon as it arrives, so scanners can start on it
+    while the crawl goes on. Fetches go through `cache` (a PageCache), so
+    scanners reading the same page later don't download it again.
+    """
+    start = normalize_url(start_url)
+    if start is None:
+        return
+    frontier = Frontier(origin(start))
+    frontier.add(start, 0)
+    in_flight = {}   # future -> (url, depth)
+    host_load = {}   # netloc -> requests in flight
+    fetched = 0      # requests finished, counted against the budget
+    pages = 0        # HTML pages yielded
+
+    def can_fetch(url):
+        return host_load.get(urlsplit(url).netloc, 0) < per_host
+
+    while frontier or in_flight:
+        check_cancelled(cancel_event)
+        # Keep every host at its limit, never past the page budget
+        while fetched + len(in_flight) < max_pages and len(in_flight) < CRAWL_WORKERS:
+            item = frontier.pop_for(can_fetch)
+            if item is None:
+                break
+            host = urlsplit(item[0]).netloc
+            host_load[host] = host_load.get(host, 0) + 1
+            in_flight[_pool.submit(contextvars.copy_context().run, fetch_document, item[0], cache, FETCH_TIMEOUT)] = item
+        if not in_flight:
+            break
+
+        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+        for future in done:
+            url, depth = in_flight.pop(future)
+            host = urlsplit(url).netloc
+            host_load[host] -= 1
+            fetched += 1
+            try:
+                doc = future.result()
+            except Exception:
+                continue
+            final = normalize_url(doc.final_url) or url
+            if depth == 0 and origin(final) != frontier.scope:
+                # The start page redirected (http->https, apex->www, ...):
+                # the site being crawled is the one it landed on
+                frontier.scope = origin(final)
+                frontier.seen.add(final)
+            if not doc.is_html or origin(final) != frontier.scope:
+                continue
+            if depth < max_depth:
+                for link in doc.links:
+                    frontier.add(urljoin(doc.final_url, link), depth + 1)
+            yield Page(pages, url, depth, doc)
+            pages += 1
@@ -1,24 +1,184 @@
+import atexit
+import json
 import os
-from supabase import create_client, Client
+import queue
+import threading
+import time
 from dotenv import load_dotenv
+from storage import MemoryStorage, SQLiteStorage, SupabaseStorage, PAGE_SIZE
 
 load_dotenv() # Load variables from .env
 
 url: str = os.environ.get("SUPABASE_URL")
 key: str = os.environ.get("SUPABASE_KEY")
 
-# Initialize the client if keys exist
-if url and key:
-    supabase: Client = create_client(url, key)
-else:
+# --- CONFIG: WRITE-BEHIND PERSISTENCE ---
+BATCH_SIZE = int(os.environ.get("SENTINEL_DB_BATCH", 20))                # rows per insert
+FLUSH_INTERVAL = float(os.environ.get("SENTINEL_DB_FLUSH_SECONDS", 2))   # max time a row waits in memory
+REPLAY_INTERVAL = float(os.environ.get("SENTINEL_DB_REPLAY_SECONDS", 30))
+JOURNAL_PATH = os.environ.get("SENTINEL_DB_JOURNAL", "scan_history.journal.jsonl")
+FLUSH_TIMEOUT = 30  # how long flush() waits for the writer thread
+
+def _create_storage():
+    """
+    SENTINEL_STORAGE picks the backend explicitly (supabase, sqlite or
+    memory); otherwise Supabase when its keys exist, else history is off.
+    The Supabase SDK is only imported when it is the backend in use.
+    """
+    backend_name = os.environ.get("SENTINEL_STORAGE")
+    if not backend_name:
+        if url and url.startswith("memory://"):
+            backend_name = "memory"
+        elif url and key:
+            backend_name = "supabase"
+
+    if backend_name == "memory":
+        return MemoryStorage()
+    if backend_name == "supabase" and url and key:
+        from supabase import create_client
+        return SupabaseStorage(create_client(url, key))
+    if backend_name == "sqlite":
+        return SQLiteStorage()
     print("[!] Warning: Supabase credentials not found. History will not be saved.")
-    supabase = None
+    return None
+
+class WriteBehindQueue:
+    """
+    Buffers scan_history rows and inserts them in batches from a background
+    thread, on BATCH_SIZE rows or every FLUSH_INTERVAL seconds, whichever
+    comes first. A batch the storage backend rejects is appended to an on-disk
+    JSONL journal and replayed once inserts succeed again.
+    """
+    def __init__(self, storage, journal_path=JOURNAL_PATH):
+        self.storage = storage
+        self.journal_path = journal_path
+        self._queue = queue.Queue()
+        self._journal_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._last_replay = 0
+        self._thread = threading.Thread(target=self._run, name="sentinel-db-writer", daemon=True)
+        self._thread.start()
+
+    def put(self, row):
+        self._queue.put(row)
+
+    def flush(self, timeout=FLUSH_TIMEOUT):
+        """
+        Writes out everything put() so far, including the batch the writer
+        thread already holds; used at shutdown and in tests. Returns False
+        if the writer didn't get there within `timeout` seconds.
+        """
+        done = threading.Event()
+        self._queue.put(done)  # the writer writes out its batch when it reaches this
+        flushed = done.wait(timeout)
+        if not flushed:
+            print(f"[!] History writer did not flush within {timeout:.0f}s")
+        self._replay()
+        return flushed
+
+    def _run(self):
+        while True:
+            batch = []
+            flushed = None
+            deadline = time.monotonic() + FLUSH_INTERVAL
+            while len(batch) < BATCH_SIZE:
+                try:
+                    item = self._queue.get(timeout=max(0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if isinstance(item, threading.Event):
+                    flushed = item
+                    break
+                batch.append(item)
+            try:
+                self._write(batch)
+            finally:
+                if flushed is not None:
+                    flushed.set()
+            if time.monotonic() - self._last_replay >= REPLAY_INTERVAL:
+                self._replay()
+
+    def _write(self, batch):
+        if not batch:
+            return
+        with self._flush_lock:
+            for start in range(0, len(batch), BATCH_SIZE):
+                rows = batch[start:start + BATCH_SIZE]
+                try:
+                    self.storage.insert_many(rows)
+                    print(f"[+] Saved {len(rows)} scan report(s) to database")
+                except Exception as e:
+                    print(f"[!] Failed to save history, journaling {len(rows)} row(s): {e}")
+                    self._spill(rows)
+
+    def _spill(self, rows):
+        with self._journal_lock:
+            with open(self.journal_path, "a", encoding="utf-8") as f:
+                for row in rows:
+                    f.write(json.dumps(row, default=str) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _replay(self):
+        """Re-sends journaled rows in batches; whatever still fails stays on disk."""
+        self._last_replay = time.monotonic()
+        with self._flush_lock, self._journal_lock:
+            try:
+                with open(self.journal_path, encoding="utf-8") as f:
+                    rows = [json.loads(line) for line in f if line.strip()]
+            except FileNotFoundError:
+                return
+            sent = 0
+            try:
+                for start in range(0, len(rows), BATCH_SIZE):
+                    self.storage.insert_many(rows[start:start + BATCH_SIZE])
+                    sent = start + BATCH_SIZE
+            except Exception as e:
+                print(f"[!] Journal replay stopped, backend still unavailable: {e}")
+            remaining = rows[sent:]
+            if remaining:
+                tmp_path = f"{self.journal_path}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    f.writelines(json.dumps(row) + "\n" for row in remaining)
+                os.replace(tmp_path, self.journal_path)
+            else:
+                os.remove(self.journal_path)
+            if sent:
+                print(f"[+] Replayed {min(sent, len(rows))} journaled scan report(s)")
+
+# Created on first use, not at import: workers that never touch history
+# never pay for the client, its connection or the writer thread
+_storage = None
+_writer = None
+_initialized = False
+_init_lock = threading.Lock()
+
+def get_storage():
+    """The history backend, or None when history is disabled."""
+    global _storage, _writer, _initialized
+    if not _initialized:
+        with _init_lock:
+            if not _initialized:
+                _storage = _create_storage()
+                if _storage:
+                    _writer = WriteBehindQueue(_storage)
+                    atexit.register(_writer.flush)
+                _initialized = True
+    return _storage
+
+def flush_history():
+    """Writes out everything still queued; called on graceful shutdown."""
+    if _writer:
+        _writer.flush()
 
 def save_scan_result(user_id, target_url, mode, risk_score, vulns_found, report_json):
     """
-    Inserts a completed scan report into the scan_history table.
+    Queues a completed scan report for the scan_history table. Returns at
+    once; the insert happens in the background (see WriteBehindQueue). The
+    row is stamped now, so a report that sits in the journal through an
+    outage keeps the time it was saved, not the time it was replayed.
     """
-    if not supabase or not user_id:
+    if not user_id or not get_storage():
         return None
 
     data = {
@@ -27,13 +187,22 @@ def save_scan_result(user_id, target_url, mode, risk_score, vulns_found, report_
         "scan_mode": mode,
         "risk_score": risk_score,
         "vulnerabilities_found": vulns_found,
-        "report_json": report_json 
+        "report_json": report_json,
+        "created_at": time.time()
     }
 
-    try:
-        response = supabase.table("scan_history").insert(data).execute()
-        print(f"[+] Scan report saved to database for user {user_id}")
-        return response
-    except Exception as e:
-        print(f"[!] Failed to save history: {e}")
-        return None
\ No newline at end of file
+    _writer.put(data)
+    return data
+
+def list_scan_history(user_id, limit=PAGE_SIZE, cursor=None, target_url=None):
+    """One page of a user's scans, newest first: (summaries, next_cursor)."""
+    storage = get_storage()
+    if not storage:
+        return [], None
+    return storage.list_scans(user_id, limit, cursor, target_url)
+
+def get_scan_record(user_id, scan_id):
+    storage = get_storage()
+    if not storage:
+        return None
+    return storage.get_scan(user_id, scan_id)
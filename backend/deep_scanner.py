@@ -1,7 +1,15 @@
+import asyncio
+import os
 import time
-import requests
-import re
-from playwright.sync_api import sync_playwright
+from page_cache import PageCache, fetch_document
+from path_enum import enumerate_paths, iter_wordlist
+from browser_pool import get_browser_pool
+from scan_executor import check_cancelled
+from scan_events import FindingList, finding_emitter
+from signatures import DB_ERRORS_DEEP, REFLECTIONS, STORAGE_SECRETS
+from rate_limit import limiter_for_url, parse_retry_after
+import profiling
+import telemetry
 # Import database save function
 from database import save_scan_result
 
@@ -13,24 +21,45 @@ SENSITIVE_PATHS = [
 ]
 
 # --- MAIN ORCHESTRATOR ---
-def run_deep_scan(target_url, user_id=None):
+@profiling.profiled("deep_scan")
+@telemetry.track_scan("deep")
+def run_deep_scan(target_url, user_id=None, cancel_event=None, on_event=None):
+    """
+    on_event(event, data), when given, receives each finding as soon as a
+    module produces it, phase start/complete markers, and the summary last.
+    """
     print(f"[*] Starting ACCURATE Deep Scan for {target_url}...")
     
     all_vulns = []
+    cache = PageCache()
+    emit = on_event or (lambda event, data: None)
+    on_finding = finding_emitter(on_event)
+    scan = telemetry.current_scan()
+
+    def run_phase(phase, module, *args):
+        emit("phase", {"phase": phase, "status": "started"})
+        with scan.phase(phase):
+            findings = module(*args, on_finding=on_finding)
+        scan.add_findings(phase, len(findings))
+        emit("phase", {"phase": phase, "status": "complete", "findings": len(findings)})
+        all_vulns.extend(findings)
 
     # PHASE 1: HEADER & COOKIE AUDIT
     print("[*] Phase 1: Security Headers & Cookies...")
-    all_vulns.extend(scan_headers_and_cookies(target_url))
+    run_phase("headers", scan_headers_and_cookies, target_url, cache)
 
     # PHASE 2: SENSITIVE FILE ENUMERATION
+    check_cancelled(cancel_event)
     print("[*] Phase 2: Sensitive File Enumeration...")
-    all_vulns.extend(scan_sensitive_files(target_url))
+    run_phase("sensitive_files", scan_sensitive_files, target_url)
 
     # PHASE 3: ACTIVE BROWSER FUZZING (Real Attacks Only)
+    check_cancelled(cancel_event)
     print("[*] Phase 3: Active Browser Fuzzing (SQLi/XSS)...")
-    all_vulns.extend(scan_active_playwright(target_url))
+    run_phase("browser_fuzzing", scan_active_playwright, target_url)
 
     # AGGREGATE REPORT
+    check_cancelled(cancel_event)
     final_report = {
         "target": target_url,
         "vulnerabilities": all_vulns,
@@ -38,7 +67,8 @@ def run_deep_scan(target_url, user_id=None):
             "high": sum(1 for v in all_vulns if v['severity'] in ['High', 'Critical']),
             "medium": sum(1 for v in all_vulns if v['severity'] == 'Medium'),
             "low": sum(1 for v in all_vulns if v['severity'] == 'Low')
-        }
+        },
+        "timings": scan.timings()
     }
     
     # SAVE TO DB (If User ID provided)
@@ -57,18 +87,19 @@ def run_deep_scan(target_url, user_id=None):
                 vulns_found=len(all_vulns), 
                 report_json=final_report 
             )
-            print(f"[*] Report saved for user {user_id}")
+            print(f"[*] Report queued for saving (user {user_id})")
         except Exception as e:
             print(f"[!] Database Save Error: {e}")
 
+    emit("summary", {"target": target_url, "summary": final_report["summary"], "vulnerabilities_found": len(all_vulns)})
     return final_report
 
 # --- MODULE 1: HEADERS & COOKIES ---
-def scan_headers_and_cookies(url):
-    vulns = []
+def scan_headers_and_cookies(url, cache=None, on_finding=None):
+    vulns = FindingList(on_finding)
     try:
-        res = requests.get(url, timeout=10)
-        headers = {k.lower(): v for k, v in res.headers.items()}
+        res = fetch_document(url, cache, timeout=10)
+        headers = res.headers
         
         # A. Header Checks
         if 'content-security-policy' not in headers:
@@ -117,139 +148,71 @@ def scan_headers_and_cookies(url):
     return vulns
 
 # --- MODULE 2: SENSITIVE FILE FUZZER ---
-def scan_sensitive_files(base_url):
+def scan_sensitive_files(base_url, wordlist=None, on_finding=None):
+    """
+    Probes SENSITIVE_PATHS, or a streamed wordlist file when one is given
+    (argument or SENTINEL_WORDLIST), through the concurrent path enumerator.
+    """
     vulns = []
-    base_url = base_url.rstrip("/")
-    
-    for path in SENSITIVE_PATHS:
-        target = base_url + path
-        try:
-            # allow_redirects=False prevents 200 OK on custom 404 pages
-            res = requests.get(target, timeout=3, allow_redirects=False)
-            
-            if res.status_code == 200:
-                # Basic check: content length > 10 bytes to avoid empty files
-                if len(res.text) > 10: 
-                    vulns.append({
-                        "type": "Sensitive File Exposure",
-                        "details": f"Publicly accessible sensitive file found: {path}",
-                        "severity": "Critical",
-                        "fix": f"Immediately delete or restrict access to {path}."
-                    })
-        except:
-            continue
+    wordlist = wordlist or os.environ.get("SENTINEL_WORDLIST")
+    paths = iter_wordlist(wordlist) if wordlist else SENSITIVE_PATHS
+
+    hits = []
+    try:
+        # Redirects are not followed and soft-404 pages are fingerprinted
+        # up front, so catch-all routes don't report every path as exposed.
+        for index, path, _ in enumerate_paths(base_url, paths):
+            vuln = {
+                "type": "Sensitive File Exposure",
+                "details": f"Publicly accessible sensitive file found: {path}",
+                "severity": "Critical",
+                "fix": f"Immediately delete or restrict access to {path}."
+            }
+            if on_finding:
+                on_finding(vuln)
+            hits.append((index, vuln))
+    except Exception as e:
+        print(f"[!] Sensitive file scan failed: {e}")
+
+    # Stream in discovery order, report in wordlist order
+    vulns.extend(vuln for _, vuln in sorted(hits, key=lambda hit: hit[0]))
     return vulns
 
 # --- MODULE 3: ACTIVE PLAYWRIGHT FUZZER ---
-def scan_active_playwright(target_url):
-    alerts = []
-    
-    # REAL ATTACK PAYLOADS
-    payloads = [
-        {"type": "SQL Injection (Deep)", "payload": "' OR '1'='1", "check": ["syntax error", "mysql", "warning", "postgres", "sql"]},
-        {"type": "Reflected XSS (Deep)", "payload": "<img src=x onerror=alert('SENTINEL')>", "check": []}
-    ]
+# REAL ATTACK PAYLOADS
+PAYLOADS = [
+    {"type": "SQL Injection (Deep)", "payload": "' OR '1'='1"},
+    {"type": "Reflected XSS (Deep)", "payload": "<img src=x onerror=alert('SENTINEL')>"}
+]
+INPUT_SELECTOR = "input:not([type='hidden']):not([type='submit'])"
 
-    try:
-        with sync_playwright() as p:
-            # Launch optimized Chromium
-            browser = p.chromium.launch(headless=True)
-            context = browser.new_context(user_agent="Sentinel-Security-Bot/2.0")
-            page = context.new_page()
-            
-            # --- 3A. NETWORK MONITOR (500 Errors & Shadow APIs) ---
-            def handle_response(response):
-                try:
-                    # Check for Server Crashes (500 Errors)
-                    if response.status >= 500:
-                        alerts.append({
-                            "type": "Server Error (Potential Vuln)",
-                            "details": f"Endpoint {response.url} crashed (Status 500) during fuzzing.",
-                            "severity": "High",
-                            "fix": "Check server logs for uncaught exceptions."
-                        })
-                    
-                    # Check for Shadow APIs (Background JSON calls)
-                    if "application/json" in response.headers.get("content-type", ""):
-                        if "api" in response.url and "google" not in response.url:
-                            alerts.append({
-                                "type": "Shadow API Detected",
-                                "details": f"Background API call intercepted: {response.method} {response.url}",
-                                "severity": "Medium",
-                                "fix": "Ensure this endpoint is documented and secured."
-                            })
-                except: pass
-
-            page.on("response", handle_response)
-
-            try:
-                # Navigate to target
-                page.goto(target_url, timeout=20000, wait_until="domcontentloaded")
-                
-                # --- 3B. STORAGE AUDIT (Secrets) ---
-                local_storage = page.evaluate("() => JSON.stringify(localStorage)")
-                session_storage = page.evaluate("() => JSON.stringify(sessionStorage)")
-                
-                combined_storage = (local_storage + session_storage).lower()
-                
-                if "token" in combined_storage or "auth" in combined_storage or "key" in combined_storage:
-                     alerts.append({
-                        "type": "Insecure Secret Storage",
-                        "details": "Found potential Auth Tokens/Keys in LocalStorage or SessionStorage.",
-                        "severity": "High",
-                        "fix": "Store tokens in HttpOnly Cookies to prevent XSS theft."
-                    })
+FUZZ_PAGES = int(os.environ.get("SENTINEL_FUZZ_PAGES", 4))          # tabs fuzzing in parallel per scan
+QUIET_MS = int(os.environ.get("SENTINEL_FUZZ_QUIET_MS", 300))         # no activity by then = input is inert
+REACTION_TIMEOUT_MS = int(os.environ.get("SENTINEL_FUZZ_TIMEOUT_MS", 5000))
 
-                # --- 3C. ACTIVE FORM FUZZING ---
-                # Find all interactive inputs
-                inputs = page.locator("input:not([type='hidden']):not([type='submit'])").all()
-                
-                # Only log info if no inputs are found (not a vulnerability)
-                if not inputs:
-                     pass 
-                
-                for i, input_el in enumerate(inputs):
-                    for attack in payloads:
-                        try:
-                            # Re-locate to avoid stale element errors
-                            current_input = page.locator("input:not([type='hidden']):not([type='submit'])").nth(i)
-                            current_input.fill(attack["payload"])
-                            current_input.press("Enter")
-                            
-                            # Wait for page reaction
-                            page.wait_for_timeout(500) 
-                            
-                            content = page.content().lower()
-                            
-                            # Check 1: SQL Injection Success (DB Errors)
-                            if attack["type"] == "SQL Injection (Deep)":
-                                for error in attack["check"]:
-                                    if error in content:
-                                        alerts.append({
-                                            "type": attack["type"],
-                                            "details": f"Payload {attack['payload']} caused DB error: {error}",
-                                            "severity": "Critical",
-                                            "fix": "Use parameterized queries (Prepared Statements)."
-                                        })
-                                        break
-                                        
-                            # Check 2: XSS Success (Reflection)
-                            if attack["type"] == "Reflected XSS (Deep)":
-                                if attack["payload"] in page.content():
-                                    alerts.append({
-                                        "type": attack["type"],
-                                        "details": f"Payload {attack['payload']} was reflected in the DOM unescaped.",
-                                        "severity": "High",
-                                        "fix": "Escape all user inputs before rendering."
-                                    })
-
-                        except Exception: continue
-                            
-            except Exception as e:
-                print(f"[!] Fuzzing error: {e}")
-
-            browser.close()
+# Resolves window.__sentinelReacted on the first DOM change after submit
+MUTATION_WATCH_JS = """() => {
+    window.__sentinelReacted = new Promise(resolve => {
+        const observer = new MutationObserver(() => { observer.disconnect(); resolve(true); });
+        observer.observe(document, {subtree: true, childList: true, characterData: true, attributes: true});
+    });
+}"""
 
+def scan_active_playwright(target_url, on_finding=None):
+    streamed = set()
+
+    def stream(alert):
+        # Alerts are deduplicated below; only stream the first of each
+        key = (alert['type'], alert['details'])
+        if on_finding and key not in streamed:
+            streamed.add(key)
+            on_finding(alert)
+
+    alerts = FindingList(stream)
+
+    try:
+        # Runs in a fresh context on the warm browser pool; no Chromium launch here
+        get_browser_pool().run(lambda context: _fuzz_in_context(context, target_url, alerts))
     except Exception as e:
         print(f"[!] Playwright Engine failed: {e}")
         return []
@@ -263,4 +226,169 @@ def scan_active_playwright(target_url):
             seen.add(key)
             unique_alerts.append(a)
 
-    return unique_alerts
\ No newline at end of file
+    return unique_alerts
+
+async def _fuzz_in_context(context, target_url, alerts):
+    page = await context.new_page()
+    # Playwright fires response events outside this task, so pin the phase now
+    phase = telemetry.current_phase()
+
+    # --- 3A. NETWORK MONITOR (500 Errors & Shadow APIs) ---
+    def handle_response(response):
+        try:
+            telemetry.record_request(int(response.headers.get("content-length") or 0), phase=phase)
+            # Check for Server Crashes (500 Errors)
+            if response.status >= 500:
+                alerts.append({
+                    "type": "Server Error (Potential Vuln)",
+                    "details": f"Endpoint {response.url} crashed (Status 500) during fuzzing.",
+                    "severity": "High",
+                    "fix": "Check server logs for uncaught exceptions."
+                })
+            
+            # Check for Shadow APIs (Background JSON calls)
+            if "application/json" in response.headers.get("content-type", ""):
+                if "api" in response.url and "google" not in response.url:
+                    alerts.append({
+                        "type": "Shadow API Detected",
+                        "details": f"Background API call intercepted: {response.request.method} {response.url}",
+                        "severity": "Medium",
+                        "fix": "Ensure this endpoint is documented and secured."
+                    })
+        except: pass
+
+    page.on("response", handle_response)
+
+    try:
+        # Navigate to target
+        await page.goto(target_url, timeout=20000, wait_until="domcontentloaded")
+        
+        # --- 3B. STORAGE AUDIT (Secrets) ---
+        local_storage = await page.evaluate("() => JSON.stringify(localStorage)")
+        session_storage = await page.evaluate("() => JSON.stringify(sessionStorage)")
+        
+        if STORAGE_SECRETS.search(local_storage + session_storage):
+             alerts.append({
+                "type": "Insecure Secret Storage",
+                "details": "Found potential Auth Tokens/Keys in LocalStorage or SessionStorage.",
+                "severity": "High",
+                "fix": "Store tokens in HttpOnly Cookies to prevent XSS theft."
+            })
+
+        # --- 3C. ACTIVE FORM FUZZING ---
+        # Every input x payload pair is an independent job; they are spread
+        # over FUZZ_PAGES tabs and each waits only as long as the page reacts.
+        input_count = await page.locator(INPUT_SELECTOR).count()
+        jobs = [(i, attack) for i in range(input_count) for attack in PAYLOADS]
+        results = [None] * len(jobs)
+        queue = asyncio.Queue()
+        for index, job in enumerate(jobs):
+            queue.put_nowait((index, job))
+
+        async def worker(worker_page):
+            while not queue.empty():
+                index, (i, attack) = queue.get_nowait()
+                try:
+                    results[index] = await _fuzz_input(worker_page, target_url, i, attack)
+                except Exception:
+                    continue
+
+        pages = [page]
+        for _ in range(min(FUZZ_PAGES, len(jobs)) - 1):
+            extra = await context.new_page()
+            extra.on("response", handle_response)
+            pages.append(extra)
+        await asyncio.gather(*(worker(p) for p in pages))
+
+        # Merge in job order so reports don't depend on which tab finished first
+        alerts.extend(alert for alert in results if alert)
+                    
+    except Exception as e:
+        print(f"[!] Fuzzing error: {e}")
+
+async def _fuzz_input(page, target_url, i, attack):
+    # Start every attempt from a clean copy of the target page. Each attempt
+    # takes a turn on the host's shared limiter, like any other probe.
+    limiter = limiter_for_url(target_url)
+    await limiter.acquire_async()
+    started = time.monotonic()
+    try:
+        response = await page.goto(target_url, timeout=20000, wait_until="domcontentloaded")
+    except Exception:
+        limiter.release(error=True)
+        raise
+    limiter.release(response.status if response else None, time.monotonic() - started,
+                    retry_after=parse_retry_after(response and await response.header_value("retry-after")))
+    current_input = page.locator(INPUT_SELECTOR).nth(i)
+    await current_input.fill(attack["payload"])
+    await _submit_and_settle(page, current_input)
+
+    content = await page.content()
+    
+    # Check 1: SQL Injection Success (DB Errors)
+    if attack["type"] == "SQL Injection (Deep)":
+        match = DB_ERRORS_DEEP.search(content)
+        if match:
+            return {
+                "type": attack["type"],
+                "details": f"Payload {attack['payload']} caused DB error: {match.text.lower()} ({match.name})",
+                "severity": "Critical",
+                "fix": "Use parameterized queries (Prepared Statements)."
+            }
+                
+    # Check 2: XSS Success (Reflection)
+    if attack["type"] == "Reflected XSS (Deep)":
+        if REFLECTIONS.search(content):
+            return {
+                "type": attack["type"],
+                "details": f"Payload {attack['payload']} was reflected in the DOM unescaped.",
+                "severity": "High",
+                "fix": "Escape all user inputs before rendering."
+            }
+    return None
+
+async def _submit_and_settle(page, input_el):
+    """
+    Presses Enter and returns as soon as the page has reacted: a main-frame
+    navigation or a DOM mutation. If no document/XHR request starts within
+    QUIET_MS the input is treated as inert; REACTION_TIMEOUT_MS caps the rest.
+    """
+    loop = asyncio.get_running_loop()
+    navigated = loop.create_future()
+    requested = loop.create_future()
+
+    def on_navigation(frame):
+        if frame == page.main_frame and not navigated.done():
+            navigated.set_result(True)
+
+    def on_request(request):
+        if request.resource_type in ("document", "xhr", "fetch") and not requested.done():
+            requested.set_result(True)
+
+    page.on("framenavigated", on_navigation)
+    page.on("request", on_request)
+    mutated = None
+    try:
+        await page.evaluate(MUTATION_WATCH_JS)
+        await input_el.press("Enter")
+        mutated = asyncio.ensure_future(page.evaluate("() => window.__sentinelReacted"))
+        signals = {navigated, mutated}
+
+        done, _ = await asyncio.wait(signals | {requested}, timeout=QUIET_MS / 1000, return_when=asyncio.FIRST_COMPLETED)
+        if not done:
+            return
+        if done == {requested}:
+            # Something is in flight; wait for it to land on the page
+            await asyncio.wait(signals, timeout=REACTION_TIMEOUT_MS / 1000, return_when=asyncio.FIRST_COMPLETED)
+        if navigated.done() or mutated.done():
+            # A destroyed execution context also means we navigated away
+            await page.wait_for_load_state("domcontentloaded", timeout=REACTION_TIMEOUT_MS)
+    except Exception:
+        pass
+    finally:
+        page.remove_listener("framenavigated", on_navigation)
+        page.remove_listener("request", on_request)
+        if mutated is not None and not mutated.done():
+            mutated.cancel()
+        if mutated is not None:
+            mutated.add_done_callback(lambda f: f.cancelled() or f.exception())
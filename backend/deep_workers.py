@@ -0,0 +1,144 @@
+import multiprocessing
+import os
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+# --- CONFIG: DEEP SCAN PROCESSES ---
+# 0 keeps deep scans on threads inside the web process (the dev server's
+# behaviour); wsgi.py turns the process pool on for production.
+PROCESSES = int(os.environ.get("SENTINEL_DEEP_PROCESSES", 0))
+CANCEL_POLL_SECONDS = 0.5
+EVENT_DRAIN_TIMEOUT = 5  # wait this long for a finished scan's last events
+
+# --- WORKER PROCESS SIDE ---
+_events = None
+
+def _init_worker(events, warm):
+    global _events
+    _events = events
+    if warm:
+        from browser_pool import warm_browser_pool
+        warm_browser_pool()
+
+def _noop():
+    return os.getpid()
+
+def _run_deep_scan(token, target_url, cancel_event, kwargs):
+    from deep_scanner import run_deep_scan
+    try:
+        return run_deep_scan(target_url, cancel_event=cancel_event,
+                             on_event=lambda event, data: _events.put((token, event, data)), **kwargs)
+    finally:
+        _events.put((token, None, None))  # this scan sends nothing after this
+
+# --- WEB PROCESS SIDE ---
+class DeepScanProcessPool:
+    """
+    Runs run_deep_scan in dedicated worker processes, each owning its own
+    warm browser pool, so Chromium and the fuzzing loop never compete with
+    quick scans for the web process's threads or GIL. Events stream back
+    over one shared queue; cancellation is forwarded to the worker.
+    """
+    def __init__(self, processes=PROCESSES, warm=True):
+        self.processes = processes
+        self.warm_browsers = warm
+        self._context = multiprocessing.get_context("spawn")  # the web process runs threads; never fork it
+        self._events = self._context.Queue()
+        self._pool = self._new_pool()
+        self._manager = None
+        self._listeners = {}  # token -> (on_event, drained Event)
+        self._lock = threading.Lock()
+        threading.Thread(target=self._drain, name="sentinel-deep-events", daemon=True).start()
+
+    def _new_pool(self):
+        return ProcessPoolExecutor(max_workers=self.processes, mp_context=self._context,
+                                   initializer=_init_worker, initargs=(self._events, self.warm_browsers))
+
+    def warm(self):
+        """Starts every worker process (and its browsers) ahead of the first scan."""
+        for _ in range(self.processes):
+            self._pool.submit(_noop)
+
+    def run(self, target_url, cancel_event=None, on_event=None, **kwargs):
+        """Same contract as run_deep_scan; blocks the calling thread until the worker is done."""
+        token = uuid.uuid4().hex
+        drained = threading.Event()
+        remote_cancel = self._get_manager().Event()
+        with self._lock:
+            self._listeners[token] = (on_event, drained)
+        try:
+            future_pool = self._pool
+            future = future_pool.submit(_run_deep_scan, token, target_url, remote_cancel, kwargs)
+            while True:
+                try:
+                    result = future.result(timeout=CANCEL_POLL_SECONDS)
+                    break
+                except FutureTimeout:
+                    if cancel_event is not None and cancel_event.is_set():
+                        remote_cancel.set()
+                except BrokenProcessPool:
+                    # A worker died (e.g. OOM-killed); later scans get fresh processes
+                    print("[!] Deep scan worker process died, restarting the pool")
+                    with self._lock:
+                        if self._pool is future_pool:
+                            self._pool = self._new_pool()
+                    raise
+                except BaseException:
+                    drained.wait(EVENT_DRAIN_TIMEOUT)
+                    raise
+            drained.wait(EVENT_DRAIN_TIMEOUT)
+            return result
+        finally:
+            with self._lock:
+                self._listeners.pop(token, None)
+
+    def shutdown(self, wait=True):
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+        self._events.put(None)
+        if self._manager is not None:
+            self._manager.shutdown()
+
+    def _get_manager(self):
+        with self._lock:
+            if self._manager is None:
+                self._manager = self._context.Manager()
+            return self._manager
+
+    def _drain(self):
+        while True:
+            item = self._events.get()
+            if item is None:
+                return
+            token, event, data = item
+            with self._lock:
+                listener = self._listeners.get(token)
+            if listener is None:
+                continue
+            on_event, drained = listener
+            if event is None:
+                drained.set()
+            elif on_event is not None:
+                try:
+                    on_event(event, data)
+                except Exception as e:
+                    print(f"[!] Deep scan event handler failed: {e}")
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_deep_pool():
+    """The process pool, or None when deep scans run in-process (PROCESSES=0)."""
+    global _pool
+    if PROCESSES <= 0:
+        return None
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = DeepScanProcessPool()
+    return _pool
+
+def shutdown_deep_pool(wait=True):
+    if _pool is not None:
+        _pool.shutdown(wait=wait)
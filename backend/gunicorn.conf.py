@@ -0,0 +1,43 @@
+# Gunicorn settings for `gunicorn -c gunicorn.conf.py wsgi:app`.
+import os
+
+# --- CONFIG: WEB TIER ---
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+
+# Jobs, batches and their event streams live in the web process's memory,
+# so one process serves every request and concurrency comes from threads.
+# Quick scans run on those threads plus the module pools; deep scans run in
+# the SENTINEL_DEEP_PROCESSES pool and PDFs in the SENTINEL_RENDER_WORKERS
+# pool, so neither can starve them. Scale out with more containers.
+workers = 1
+worker_class = "gthread"
+# Request threads: SSE streams may hold up to SENTINEL_MAX_STREAMS of them
+# (see server.py); the rest serve quick scans and short API calls, so
+# watchers of long scans can't starve them.
+threads = int(os.environ.get("SENTINEL_MAX_STREAMS", 32)) + int(os.environ.get("SENTINEL_WEB_THREADS", 32))
+timeout = 120
+keepalive = 5
+
+# On SIGTERM gthread stops accepting and waits up to graceful_timeout for
+# open requests before worker_exit runs, and SSE streams only end with their
+# scan. So the SIGTERM hook below starts server.shutdown() straight away: it
+# ends the streams, gives running deep scans SENTINEL_SHUTDOWN_TIMEOUT, then
+# flushes history; worker_exit waits for it. All of that must fit in
+# graceful_timeout, after which the worker is killed.
+graceful_timeout = int(float(os.environ.get("SENTINEL_SHUTDOWN_TIMEOUT", 30))) + 15
+
+def post_worker_init(worker):
+    import signal
+    import wsgi
+    wsgi.warm_up()
+    previous = signal.getsignal(signal.SIGTERM)
+
+    def on_sigterm(signum, frame):
+        wsgi.begin_shutdown()
+        if callable(previous):
+            previous(signum, frame)
+    signal.signal(signal.SIGTERM, on_sigterm)
+
+def worker_exit(server, worker):
+    import wsgi
+    wsgi.shutdown()
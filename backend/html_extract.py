@@ -0,0 +1,82 @@
+import re
+from html.parser import HTMLParser
+
+# Candidate PII, matched against text, comments and attribute values as the tokenizer emits them
+EMAIL_PATTERN = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+LINK_TAGS = ("a", "area")
+
+class Extraction:
+    """Everything the scanners read from one HTML page."""
+    def __init__(self):
+        self.forms = []    # [{"action", "method", "inputs": [{"type", "name", "value"}]}]
+        self.scripts = []  # external script srcs, in page order
+        self.links = []    # a/area hrefs, in page order
+        self.emails = set()
+
+    def to_dict(self):
+        return {"forms": self.forms, "scripts": self.scripts, "links": self.links, "emails": sorted(self.emails)}
+
+    @classmethod
+    def from_dict(cls, data):
+        extraction = cls()
+        extraction.forms = data["forms"]
+        extraction.scripts = data["scripts"]
+        extraction.links = data["links"]
+        extraction.emails = set(data["emails"])
+        return extraction
+
+class _Extractor(HTMLParser):
+    """
+    Streaming tokenizer: no tree is built, each tag is handled once as it
+    goes past. Forms still open when an <input> arrives get that input,
+    which matches how a DOM would nest them.
+    """
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.result = Extraction()
+        self._open_forms = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = {name: value if value is not None else "" for name, value in attrs}
+        for value in attrs.values():
+            if "@" in value:
+                self.result.emails.update(EMAIL_PATTERN.findall(value))
+
+        if tag == "form":
+            form = {"action": attrs.get("action", "").lower(), "method": attrs.get("method", "get").lower(), "inputs": []}
+            self.result.forms.append(form)
+            self._open_forms.append(form)
+        elif tag == "input":
+            field = {"type": attrs.get("type", "text"), "name": attrs.get("name"), "value": attrs.get("value", "")}
+            for form in self._open_forms:
+                form["inputs"].append(field)
+        elif tag == "script" and attrs.get("src"):
+            self.result.scripts.append(attrs["src"])
+        elif tag in LINK_TAGS and attrs.get("href"):
+            self.result.links.append(attrs["href"])
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag == "form":
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag == "form" and self._open_forms:
+            self._open_forms.pop()
+
+    def handle_data(self, data):
+        if "@" in data:
+            self.result.emails.update(EMAIL_PATTERN.findall(data))
+
+    handle_comment = handle_data
+
+def extract(html):
+    """Parses an HTML string once and returns its Extraction."""
+    parser = _Extractor()
+    try:
+        parser.feed(html)
+        parser.close()
+    except Exception as e:
+        # Keep whatever was extracted before the markup got too broken
+        print(f"[!] HTML extraction stopped early: {e}")
+    return parser.result
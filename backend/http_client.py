@@ -0,0 +1,119 @@
+import os
+import random
+import threading
+import time
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+import httpx
+from rate_limit import OVERLOAD_STATUSES, limiter_for_url, parse_retry_after
+import telemetry
+
+# --- CONFIG: STEALTH HEADERS ---
+USER_AGENTS = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.114 Safari/537.36"
+]
+
+# --- CONFIG: TRANSPORT POLICY ---
+DEFAULT_TIMEOUT = float(os.environ.get("SENTINEL_HTTP_TIMEOUT", 5))
+POOL_HOSTS = int(os.environ.get("SENTINEL_POOL_HOSTS", 64))       # hosts kept warm at once
+POOL_PER_HOST = int(os.environ.get("SENTINEL_POOL_PER_HOST", 32)) # keep-alive sockets per host
+# HTTPS targets that offer HTTP/2 (ALPN) get one connection carrying every
+# concurrent probe as a multiplexed stream; everything else is HTTP/1.1
+# keep-alive. How many probes one host sees at once is the limiter's call.
+HTTP2 = os.environ.get("SENTINEL_HTTP2", "1") == "1"
+
+# Only connection failures are retried inside the transport: nothing was
+# sent, so even an injection POST can't double-submit. Overloaded
+# responses are re-sent by request(), through the host's limiter.
+CONNECT_RETRIES = 2
+
+# Throttled or overloaded GET/HEADs are re-sent after the host's backoff
+THROTTLE_RETRIES = int(os.environ.get("SENTINEL_THROTTLE_RETRIES", 2))
+
+_session = None
+_session_lock = threading.Lock()
+
+def get_header():
+    return {"User-Agent": random.choice(USER_AGENTS)}
+
+def get_session():
+    """
+    Returns the process-wide httpx.Client. Connections are kept alive and
+    reused per host (multiplexed over HTTP/2 where the target offers it),
+    so a scan firing dozens of probes at one target pays the TCP/TLS
+    handshake once instead of on every request.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                limits = httpx.Limits(max_connections=POOL_HOSTS * POOL_PER_HOST,
+                                      max_keepalive_connections=POOL_HOSTS * POOL_PER_HOST)
+                _session = httpx.Client(
+                    transport=httpx.HTTPTransport(http2=HTTP2, limits=limits, retries=CONNECT_RETRIES),
+                    # The client is shared by every scan, so never let one target's
+                    # cookies ride along on later probes. Per-response cookies are
+                    # still available on res.cookies.
+                    cookies=CookieJar(policy=DefaultCookiePolicy(allowed_domains=[])),
+                    follow_redirects=True,
+                    timeout=DEFAULT_TIMEOUT,
+                )
+    return _session
+
+def request(method, url, **kwargs):
+    """
+    Every request waits its turn on the target host's shared limiter and
+    reports back how it went. A 429, 502, 503 or 504 to a GET or HEAD is
+    retried once the host's backoff (or Retry-After pause) is over; other
+    methods get the response.
+
+    Takes httpx's request keywords plus stream=True, which returns before
+    the body is read; the caller must then close() the response.
+    """
+    kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+    stream = kwargs.pop("stream", False)
+    follow_redirects = kwargs.pop("follow_redirects", True)
+    headers = get_header()
+    headers.update(kwargs.pop("headers", None) or {})
+    limiter = limiter_for_url(url)
+    client = get_session()
+
+    for attempt in range(THROTTLE_RETRIES + 1):
+        limiter.acquire()
+        started = time.monotonic()
+        try:
+            res = client.send(client.build_request(method, url, headers=headers, **kwargs),
+                              stream=stream, follow_redirects=follow_redirects)
+        except (httpx.TimeoutException, httpx.NetworkError):
+            limiter.release(error=True)
+            telemetry.record_request(error=True)
+            raise
+        except Exception:
+            limiter.release()
+            telemetry.record_request(error=True)
+            raise
+        limiter.release(res.status_code, time.monotonic() - started,
+                        retry_after=parse_retry_after(res.headers.get("Retry-After")))
+        telemetry.record_request(_body_size(res, stream))
+        if res.status_code not in OVERLOAD_STATUSES or method.upper() not in ("GET", "HEAD") or attempt == THROTTLE_RETRIES:
+            return res
+        res.close()
+
+def _body_size(res, streamed):
+    # A streamed body hasn't been read yet; trust its declared length
+    if streamed:
+        try:
+            return int(res.headers.get("Content-Length") or 0)
+        except ValueError:
+            return 0
+    return len(res.content)
+
+def get(url, **kwargs):
+    return request("GET", url, **kwargs)
+
+def post(url, **kwargs):
+    return request("POST", url, **kwargs)
+
+def head(url, **kwargs):
+    kwargs.setdefault("follow_redirects", False)
+    return request("HEAD", url, **kwargs)
@@ -0,0 +1,114 @@
+import contextvars
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urljoin
+import http_client
+from scan_executor import current_call
+
+# --- CONFIG: PAYLOAD MATRIX ---
+# Shared by every scan in the process, so this caps total in-flight probes.
+INJECTION_WORKERS = int(os.environ.get("SENTINEL_INJECTION_WORKERS", 16))
+# Probes one matrix keeps queued or running at once, so a page with hundreds
+# of forms takes its turn on the pool instead of flooding it for everyone.
+MAX_IN_FLIGHT = int(os.environ.get("SENTINEL_INJECTION_PER_SCAN", 4))
+
+_pool = ThreadPoolExecutor(max_workers=INJECTION_WORKERS, thread_name_prefix="sentinel-inject")
+
+class Hit:
+    def __init__(self, index, form_index, field, payload, target_url, evidence):
+        self.index = index
+        self.form_index = form_index
+        self.field = field
+        self.payload = payload
+        self.target_url = target_url
+        self.evidence = evidence  # whatever is_hit returned, e.g. a signature Match
+
+# What became of one attempt
+_ANSWERED, _FAILED, _SKIPPED, _EXPIRED = "answered", "failed", "skipped", "expired"
+
+def injectable_fields(form):
+    return [i for i in form["inputs"] if i["name"] and i["type"] != "submit"]
+
+def build_work_list(forms, payloads):
+    """Expands every (form, field, payload) combination, in a fixed order."""
+    work = []
+    for form_index, form in enumerate(forms):
+        for field in injectable_fields(form):
+            for payload in payloads:
+                work.append((form_index, field, payload))
+    return work
+
+def submit_form(base_url, form, data, timeout=3):
+    target_url = urljoin(base_url, form["action"])
+    if form["method"] == "post":
+        return target_url, http_client.post(target_url, data=data, timeout=timeout)
+    return target_url, http_client.get(target_url, params=data, timeout=timeout)
+
+def run_injection_matrix(base_url, forms, payloads, inject, is_hit):
+    """
+    Sends one request per (form, field, payload): the payload goes into that
+    field via inject(field, payload), every other field keeps a benign value.
+    Up to MAX_IN_FLIGHT requests run concurrently; once a form has a
+    confirmed hit, its later work items are skipped. Returns the Hits
+    ordered by work-list position, so the result does not depend on which
+    request finished first.
+
+    Inside a ModuleBatch the matrix stops at its module's deadline, and
+    flags the call incomplete (see ModuleCall) if it stopped early or no
+    request got a response: "no hits" then means "not tested", not "clean".
+    """
+    work = build_work_list(forms, payloads)
+    first_hit = [len(work)] * len(forms)  # per form: lowest work index that hit
+    lock = threading.Lock()
+    call = current_call()
+
+    def attempt(index, form_index, field, payload):
+        if call is not None and call.expired():
+            return _EXPIRED, None
+        if first_hit[form_index] < index:
+            return _SKIPPED, None
+        form = forms[form_index]
+        data = {}
+        for input_tag in injectable_fields(form):
+            if input_tag is field:
+                data[input_tag["name"]] = inject(input_tag, payload)
+            else:
+                data[input_tag["name"]] = input_tag.get("value") or "test"
+        try:
+            target_url, res = submit_form(base_url, form, data)
+        except Exception:
+            return _FAILED, None
+        evidence = is_hit(res, payload)
+        if not evidence:
+            return _ANSWERED, None
+        with lock:
+            first_hit[form_index] = min(first_hit[form_index], index)
+        return _ANSWERED, Hit(index, form_index, field["name"], payload, target_url, evidence)
+
+    # A sliding window rather than the whole matrix at once: other scans'
+    # probes queued behind this one wait for at most MAX_IN_FLIGHT of ours
+    outcomes = {_ANSWERED: 0, _FAILED: 0, _SKIPPED: 0, _EXPIRED: 0}
+    hits = []
+    pending = set()
+    items = iter(enumerate(work))
+    while True:
+        while len(pending) < MAX_IN_FLIGHT and not (call is not None and call.expired()):
+            item = next(items, None)
+            if item is None:
+                break
+            index, (form_index, field, payload) = item
+            pending.add(_pool.submit(contextvars.copy_context().run, attempt, index, form_index, field, payload))
+        if not pending:
+            break
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            outcome, hit = future.result()
+            outcomes[outcome] += 1
+            if hit is not None:
+                hits.append(hit)
+
+    finished = sum(outcomes.values()) == len(work) and not outcomes[_EXPIRED]
+    if call is not None and work and (not finished or (outcomes[_FAILED] and not outcomes[_ANSWERED])):
+        call.mark_incomplete()
+    return sorted(hits, key=lambda hit: hit.index)
@@ -0,0 +1,146 @@
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, wait
+from scan_executor import ScanCancelled
+from scan_events import EventStream
+
+# --- CONFIG: DEEP SCAN JOB QUEUE ---
+MAX_RUNNING = int(os.environ.get("SENTINEL_DEEP_WORKERS", 2))     # deep scans executing at once
+MAX_QUEUED = int(os.environ.get("SENTINEL_DEEP_QUEUE", 100))      # waiting jobs before we refuse new ones
+JOB_TTL = float(os.environ.get("SENTINEL_JOB_TTL", 3600))         # seconds a finished job stays fetchable
+
+class QueueFull(Exception):
+    pass
+
+class ShuttingDown(Exception):
+    """The queue no longer accepts jobs because the server is stopping."""
+
+class Job:
+    def __init__(self, kind, target):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.target = target
+        self.status = "queued"
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.result = None
+        self.error = None
+        self.cancel_event = threading.Event()
+        self.events = EventStream()
+        self.future = None
+
+    @property
+    def finished(self):
+        return self.status in ("done", "failed", "cancelled")
+
+    def to_dict(self):
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "target": self.target,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+        }
+
+class JobQueue:
+    """
+    Runs long scans off the request thread on a bounded worker pool.
+    Callers get a Job back immediately and poll it for status and result.
+    """
+    def __init__(self, max_running=MAX_RUNNING, max_queued=MAX_QUEUED, ttl=JOB_TTL):
+        self.max_queued = max_queued
+        self.ttl = ttl
+        self._pool = ThreadPoolExecutor(max_workers=max_running, thread_name_prefix="sentinel-job")
+        self._jobs = {}
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def submit(self, kind, target, func, *args, **kwargs):
+        """
+        Queues func(*args, cancel_event=..., on_event=..., **kwargs). The
+        function should check the event between phases and raise
+        ScanCancelled when it is set; on_event feeds the job's EventStream.
+        """
+        with self._lock:
+            if self._closed:
+                raise ShuttingDown("Server is shutting down")
+            self._prune()
+            if sum(1 for j in self._jobs.values() if j.status == "queued") >= self.max_queued:
+                raise QueueFull(f"{self.max_queued} jobs already waiting")
+            job = Job(kind, target)
+            self._jobs[job.id] = job
+        job.future = self._pool.submit(self._execute, job, func, args, kwargs)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        """Queued jobs never start; running jobs stop at their next checkpoint."""
+        job = self.get(job_id)
+        if job is None or job.finished:
+            return job
+        job.cancel_event.set()
+        if job.future is not None and job.future.cancel():
+            self._finish(job, "cancelled")
+        return job
+
+    def shutdown(self, timeout):
+        """
+        Stops taking jobs and cancels the queued ones. Running jobs get
+        `timeout` seconds to finish, then are cancelled at their next checkpoint.
+        """
+        with self._lock:
+            self._closed = True
+            jobs = list(self._jobs.values())
+        for job in jobs:
+            if job.status == "queued":
+                self.cancel(job.id)
+        running = [job.future for job in jobs if job.status == "running" and job.future is not None]
+        _, unfinished = wait(running, timeout=timeout)
+        if unfinished:
+            print(f"[!] Cancelling {len(unfinished)} deep scan(s) still running at shutdown")
+            for job in jobs:
+                job.cancel_event.set()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self):
+        with self._lock:
+            statuses = [j.status for j in self._jobs.values()]
+        return {s: statuses.count(s) for s in ("queued", "running", "done", "failed", "cancelled")}
+
+    def _execute(self, job, func, args, kwargs):
+        if job.cancel_event.is_set():
+            self._finish(job, "cancelled")
+            return
+        job.status = "running"
+        job.started_at = time.time()
+        try:
+            job.result = func(*args, cancel_event=job.cancel_event, on_event=job.events.emit, **kwargs)
+            self._finish(job, "done")
+        except ScanCancelled:
+            self._finish(job, "cancelled")
+        except Exception as e:
+            print(f"[!] Job {job.id} failed: {e}")
+            job.error = str(e)
+            self._finish(job, "failed")
+
+    def _finish(self, job, status):
+        job.status = status
+        job.finished_at = time.time()
+        job.events.emit("status", job.to_dict())
+        job.events.close()
+
+    def _prune(self):
+        cutoff = time.time() - self.ttl
+        for job_id in [j.id for j in self._jobs.values() if j.finished and j.finished_at < cutoff]:
+            del self._jobs[job_id]
+
+deep_scan_jobs = JobQueue()
@@ -0,0 +1,150 @@
+import contextvars
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import http_client
+
+# --- CONFIG: JAVASCRIPT ASSET ANALYSIS ---
+JS_WORKERS = int(os.environ.get("SENTINEL_JS_WORKERS", 8))                 # shared by all scans
+MAX_SCRIPT_BYTES = int(os.environ.get("SENTINEL_JS_MAX_KB", 5120)) * 1024  # stop reading a bundle past this
+CACHE_ENTRIES = int(os.environ.get("SENTINEL_JS_CACHE_ENTRIES", 4096))
+CHUNK_BYTES = 64 * 1024
+CHUNK_OVERLAP = 512  # longest endpoint literal we can still catch across a chunk boundary
+FETCH_TIMEOUT = 3
+
+# Quoted /api/..., /v1/..., /admin/..., /private/... paths
+ENDPOINT_PATTERN = re.compile(rb'["\'](\/(?:api|v1|admin|private)\/[a-zA-Z0-9_\-\/]+)["\']')
+
+_pool = ThreadPoolExecutor(max_workers=JS_WORKERS, thread_name_prefix="sentinel-js")
+
+class _LRU:
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+# sha256 of bundle bytes (up to the cap) -> endpoints, so a 304 for a known
+# bundle, even one first seen on another target, needs no body at all
+_endpoints_by_digest = _LRU(CACHE_ENTRIES)
+# script URL -> (validator headers, digest), for conditional re-fetches
+_validators_by_url = _LRU(CACHE_ENTRIES)
+
+_inflight = {}  # script URL -> Future, so concurrent scans share one download
+_inflight_lock = threading.Lock()
+
+def read_capped(res):
+    """
+    Streams a response body in chunks up to MAX_SCRIPT_BYTES, hashing and
+    scanning each chunk as it arrives; only the last CHUNK_OVERLAP bytes are
+    kept between chunks. Returns (endpoints, sha256 hexdigest, truncated).
+    """
+    digest = hashlib.sha256()
+    found = set()
+    tail = b""
+    total = 0
+    truncated = False
+    for chunk in res.iter_bytes(CHUNK_BYTES):
+        if total + len(chunk) > MAX_SCRIPT_BYTES:
+            chunk = chunk[:MAX_SCRIPT_BYTES - total]
+            truncated = True
+        total += len(chunk)
+        digest.update(chunk)
+        window = tail + chunk
+        found.update(m.decode("ascii") for m in ENDPOINT_PATTERN.findall(window))
+        tail = window[-CHUNK_OVERLAP:]
+        if truncated:
+            break
+    return sorted(found), digest.hexdigest(), truncated
+
+def _cached_endpoints(digest, state):
+    endpoints = _endpoints_by_digest.get(digest)
+    if endpoints is None and state is not None:
+        endpoints = state.script_endpoints(digest)
+        if endpoints is not None:
+            _endpoints_by_digest.put(digest, endpoints)
+    return endpoints
+
+def _fetch_endpoints(script_url, state=None):
+    headers = {}
+    known = _validators_by_url.get(script_url)
+    if known is None and state is not None:
+        known = state.script(script_url)
+    if known is not None:
+        headers = known[0]
+
+    res = http_client.get(script_url, headers=headers, stream=True, timeout=FETCH_TIMEOUT)
+    try:
+        if res.status_code == 304 and known is not None:
+            endpoints = _cached_endpoints(known[1], state)
+            if endpoints is not None:
+                return endpoints
+            # Digest aged out of the cache; fetch the body after all
+            res.close()
+            res = http_client.get(script_url, stream=True, timeout=FETCH_TIMEOUT)
+        res.raise_for_status()
+
+        endpoints, digest, truncated = read_capped(res)
+        if truncated:
+            print(f"[!] {script_url} exceeds {MAX_SCRIPT_BYTES // 1024} KB, analysed the first part only")
+        _endpoints_by_digest.put(digest, endpoints)
+
+        validators = {}
+        if res.headers.get("ETag"):
+            validators["If-None-Match"] = res.headers["ETag"]
+        if res.headers.get("Last-Modified"):
+            validators["If-Modified-Since"] = res.headers["Last-Modified"]
+        if validators and not truncated:
+            _validators_by_url.put(script_url, (validators, digest))
+        if state is not None and not truncated:
+            state.record_script(script_url, validators, digest, endpoints)
+        return endpoints
+    finally:
+        res.close()
+
+def analyze_scripts(script_urls, state=None):
+    """
+    Fetches and scans every script concurrently. Returns {url: endpoints}
+    in the order given; scripts that fail to load are left out. Scans
+    asking for the same URL at the same time share one download. With a
+    ScanState, validators and endpoints also persist across restarts.
+    """
+    unique = list(dict.fromkeys(script_urls))
+    with _inflight_lock:
+        futures = {}
+        owned = []
+        for url in unique:
+            future = _inflight.get(url)
+            if future is None:
+                future = _inflight[url] = _pool.submit(contextvars.copy_context().run, _fetch_endpoints, url, state)
+                owned.append(url)
+            futures[url] = future
+
+    results = {}
+    try:
+        for url in unique:
+            try:
+                results[url] = futures[url].result()
+            except Exception:
+                continue
+    finally:
+        with _inflight_lock:
+            for url in owned:
+                _inflight.pop(url, None)
+    return results
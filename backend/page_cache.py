@@ -0,0 +1,186 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from html_extract import extract, Extraction
+import http_client
+from scan_state import body_hash
+
+# --- CONFIG: CROSS-SCAN CACHE (off by default, scans should see live data) ---
+SHARED_TTL = float(os.environ.get("SENTINEL_DOC_CACHE_TTL", 0))
+SHARED_MAX_BYTES = int(os.environ.get("SENTINEL_DOC_CACHE_MB", 64)) * 1024 * 1024
+
+class Document:
+    """
+    One fetched page plus everything the scanners derive from it.
+    The HTML is parsed on first use only, and only once.
+    """
+    def __init__(self, url, response, extracted=None):
+        self.url = url
+        self.final_url = str(response.url) or url  # after redirects; base for relative links
+        self.status_code = response.status_code
+        self.headers = {k.lower(): v for k, v in response.headers.items()}
+        self.cookies = response.cookies.jar  # http.cookiejar.Cookie objects
+        self.content = response.content
+        self.text = response.text
+        self.not_modified = False  # True when restored from a rescan's 304
+        self._body_hash = None
+        self._extracted = extracted
+        self._parse_lock = threading.Lock()
+
+    @property
+    def size(self):
+        return len(self.content) + len(self.text)
+
+    @property
+    def forms(self):
+        return self._parse().forms
+
+    @property
+    def scripts(self):
+        return self._parse().scripts
+
+    @property
+    def links(self):
+        return self._parse().links
+
+    @property
+    def emails(self):
+        return self._parse().emails
+
+    @property
+    def body_hash(self):
+        if self._body_hash is None:
+            self._body_hash = body_hash(self.content)
+        return self._body_hash
+
+    @property
+    def is_html(self):
+        return "html" in self.headers.get("content-type", "text/html")
+
+    def _parse(self):
+        if self._extracted is None:
+            with self._parse_lock:
+                if self._extracted is None:
+                    self._extracted = extract(self.text)
+        return self._extracted
+
+class DocumentLRU:
+    """Cross-scan cache of Documents, bounded by age and total bytes."""
+    def __init__(self, ttl, max_bytes):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._items = OrderedDict()  # url -> (expires_at, doc)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, url):
+        with self._lock:
+            item = self._items.get(url)
+            if item is None:
+                return None
+            expires_at, doc = item
+            if expires_at < time.monotonic():
+                self._drop(url)
+                return None
+            self._items.move_to_end(url)
+            return doc
+
+    def put(self, url, doc):
+        if doc.size > self.max_bytes:
+            return
+        with self._lock:
+            if url in self._items:
+                self._drop(url)
+            self._items[url] = (time.monotonic() + self.ttl, doc)
+            self._bytes += doc.size
+            while self._bytes > self.max_bytes:
+                self._drop(next(iter(self._items)))
+
+    def _drop(self, url):
+        _, doc = self._items.pop(url)
+        self._bytes -= doc.size
+
+_shared = DocumentLRU(SHARED_TTL, SHARED_MAX_BYTES) if SHARED_TTL > 0 else None
+
+def load_document(url, timeout=http_client.DEFAULT_TIMEOUT):
+    if _shared is not None:
+        doc = _shared.get(url)
+        if doc is not None:
+            return doc
+    doc = Document(url, http_client.get(url, timeout=timeout))
+    if _shared is not None:
+        _shared.put(url, doc)
+    return doc
+
+def load_incremental(url, state, timeout=http_client.DEFAULT_TIMEOUT):
+    """
+    Conditional fetch against what the last scan saw. An unchanged page
+    (304, or the same body hash) comes back with its stored extraction, so
+    it is neither downloaded nor parsed again.
+    """
+    record = state.page(url)
+    headers = record.conditional_headers() if record is not None else {}
+    response = http_client.get(url, headers=headers, timeout=timeout)
+
+    if response.status_code == 304 and record is not None:
+        state.touch_page(url)
+        doc = Document(url, response, extracted=Extraction.from_dict(record.extraction))
+        doc.not_modified = True
+        doc._body_hash = record.body_hash
+        return doc
+
+    doc = Document(url, response)
+    if record is not None and doc.body_hash == record.body_hash:
+        doc._extracted = Extraction.from_dict(record.extraction)
+    if response.status_code == 200 and doc.is_html:
+        state.record_page(url, response.headers.get("ETag"), response.headers.get("Last-Modified"),
+                          doc.body_hash, doc._parse().to_dict())
+    return doc
+
+class _Entry:
+    def __init__(self):
+        self.ready = threading.Event()
+        self.doc = None
+        self.error = None
+
+class PageCache:
+    """
+    Per-scan fetch-once store keyed by URL. Concurrent modules asking for
+    the same page share a single in-flight request. With a ScanState,
+    pages are fetched incrementally against the previous scan.
+    """
+    def __init__(self, state=None):
+        self.state = state
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def fetch(self, url, timeout=http_client.DEFAULT_TIMEOUT):
+        with self._lock:
+            entry = self._entries.get(url)
+            owner = entry is None
+            if owner:
+                entry = self._entries[url] = _Entry()
+
+        if owner:
+            try:
+                if self.state is not None:
+                    entry.doc = load_incremental(url, self.state, timeout)
+                else:
+                    entry.doc = load_document(url, timeout)
+            except Exception as e:
+                entry.error = e
+            finally:
+                entry.ready.set()
+        else:
+            entry.ready.wait()
+
+        if entry.error is not None:
+            raise entry.error
+        return entry.doc
+
+def fetch_document(url, cache=None, timeout=http_client.DEFAULT_TIMEOUT):
+    """Fetches through the scan's PageCache when one is given."""
+    if cache is None:
+        return load_document(url, timeout)
+    return cache.fetch(url, timeout)
@@ -0,0 +1,128 @@
+import contextvars
+import hashlib
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import http_client
+
+# --- CONFIG: ENUMERATION ENGINE ---
+ENUM_WORKERS = int(os.environ.get("SENTINEL_ENUM_WORKERS", 16))
+PEEK_BYTES = 1024        # how much of a hit we ever download
+MIN_BODY_BYTES = 10      # anything shorter is treated as an empty file
+SOFT_404_LENGTH_SLACK = 0.05
+
+def iter_wordlist(path):
+    """
+    Streams paths from a wordlist file one line at a time, so 100k+ entry
+    lists never sit in memory. Blank lines and '#' comments are skipped.
+    """
+    with open(path, encoding="utf-8", errors="ignore") as f:
+        for line in f:
+            entry = line.strip()
+            if not entry or entry.startswith("#"):
+                continue
+            yield entry if entry.startswith("/") else "/" + entry
+
+class Probe:
+    """What we learned about one path: status, size and a hash of its first bytes."""
+    def __init__(self, status, length, digest, size_known):
+        self.status = status
+        self.length = length
+        self.digest = digest
+        self.size_known = size_known
+
+def _peek(base_url, path):
+    # A ranged GET asks the server for the first KB only; servers that ignore
+    # Range still get cut off after PEEK_BYTES.
+    res = http_client.get(base_url + path, timeout=3, follow_redirects=False, stream=True,
+                          headers={"Range": f"bytes=0-{PEEK_BYTES - 1}"})
+    try:
+        body = next(res.iter_bytes(PEEK_BYTES), b"")
+    finally:
+        res.close()
+    total = res.headers.get("Content-Range", "").rpartition("/")[2]
+    if res.status_code == 206 and total.isdigit():
+        length, size_known = int(total), True
+    elif res.headers.get("Content-Length", "").isdigit() and res.status_code != 206:
+        length, size_known = int(res.headers["Content-Length"]), True
+    else:
+        length, size_known = len(body), False
+    status = 200 if res.status_code == 206 else res.status_code
+    # Many soft-404 pages echo the requested path back; fingerprint without it
+    echoed = path.encode()
+    length -= body.count(echoed) * len(echoed)
+    digest = hashlib.sha1(body.replace(echoed, b"")).hexdigest()
+    return Probe(status, length, digest, size_known)
+
+def probe_path(base_url, path, need_body=True):
+    """
+    HEAD first; only paths that answer 200 (or refuse HEAD) get a ranged GET.
+    Without a soft-404 baseline to compare against, a HEAD that reports a
+    Content-Length is enough and no body is fetched at all.
+    """
+    res = http_client.head(base_url + path, timeout=3)
+    if res.status_code not in (200, 405, 501):
+        return Probe(res.status_code, 0, None, False)
+    length = res.headers.get("Content-Length", "")
+    if res.status_code == 200 and not need_body and length.isdigit():
+        return Probe(200, int(length), None, True)
+    return _peek(base_url, path)
+
+def fingerprint_not_found(base_url):
+    """
+    Requests a path that cannot exist. If the server answers 200 it serves a
+    soft-404 page, and anything looking like that page is a false positive.
+    """
+    path = f"/sentinel-{uuid.uuid4().hex}"
+    try:
+        probe = _peek(base_url, path)
+    except Exception:
+        return None
+    return probe if probe.status == 200 else None
+
+def is_soft_404(probe, baseline):
+    if baseline is None or probe.status != baseline.status:
+        return False
+    if probe.digest == baseline.digest:
+        return True
+    if probe.size_known and baseline.size_known and baseline.length:
+        return abs(probe.length - baseline.length) <= baseline.length * SOFT_404_LENGTH_SLACK
+    return False
+
+def enumerate_paths(base_url, paths, workers=ENUM_WORKERS):
+    """
+    Probes every path concurrently with at most `workers` requests in flight
+    and yields (index, path, Probe) for real 200 hits as they are confirmed.
+    `paths` may be any iterable, including a streaming wordlist; `index` is
+    the entry's position in it, for callers that want a stable order.
+    """
+    base_url = base_url.rstrip("/")
+    baseline = fingerprint_not_found(base_url)
+
+    def check(index, path):
+        try:
+            probe = probe_path(base_url, path, need_body=baseline is not None)
+        except Exception:
+            return index, path, None
+        if probe.status != 200 or probe.length <= MIN_BODY_BYTES:
+            return index, path, None
+        if is_soft_404(probe, baseline):
+            return index, path, None
+        return index, path, probe
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sentinel-enum") as pool:
+        pending = set()
+        for index, path in enumerate(paths):
+            # Keep the queue bounded so a huge wordlist is read lazily
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                yield from _hits(done)
+            pending.add(pool.submit(contextvars.copy_context().run, check, index, path))
+        done, _ = wait(pending)
+        yield from _hits(done)
+
+def _hits(futures):
+    for future in futures:
+        index, path, probe = future.result()
+        if probe is not None:
+            yield index, path, probe
@@ -1,34 +1,149 @@
+import asyncio
+import os
 import socket
+import errno
+from rate_limit import get_limiter
 
-def scan_ports(target_url):
+# --- CONFIG: SWEEP LIMITS ---
+CONNECT_TIMEOUT = float(os.environ.get("SENTINEL_PORT_TIMEOUT", 0.5))
+MAX_IN_FLIGHT = int(os.environ.get("SENTINEL_PORT_CONCURRENCY", 256))  # sockets open at once
+HOST_RATE = float(os.environ.get("SENTINEL_PORT_RATE", 2000))          # connects/sec per host, all sweeps combined
+DEFAULT_PROFILE = os.environ.get("SENTINEL_PORT_PROFILE", "common")
+
+# Local resource exhaustion: the sweep itself is going too fast
+OVERLOAD_ERRNOS = {errno.EMFILE, errno.ENFILE, errno.ENOBUFS, errno.EAGAIN, errno.EADDRNOTAVAIL}
+
+# --- CONFIG: PORT PROFILES ---
+SERVICE_NAMES = {
+    21: "FTP", 22: "SSH", 23: "Telnet", 25: "SMTP", 53: "DNS", 80: "HTTP",
+    110: "POP3", 111: "RPC", 135: "MSRPC", 139: "NetBIOS", 143: "IMAP",
+    443: "HTTPS", 445: "SMB", 465: "SMTPS", 587: "SMTP Submission",
+    993: "IMAPS", 995: "POP3S", 1433: "MSSQL Database", 1521: "Oracle Database",
+    2049: "NFS", 2375: "Docker API", 3000: "Dev Server", 3306: "MySQL Database",
+    3389: "RDP", 5000: "Dev Server", 5432: "PostgreSQL Database", 5601: "Kibana",
+    5900: "VNC", 6379: "Redis", 8000: "Alt HTTP", 8080: "Alt HTTP",
+    8443: "Alt HTTPS", 9000: "Admin Panel", 9200: "Elasticsearch",
+    11211: "Memcached", 27017: "MongoDB",
+}
+
+COMMON_PORTS = [21, 22, 80, 443, 3306, 5000, 8080]
+
+# Highest-yield ports first (services most often found exposed on the
+# internet), padded below with the rest of the low range.
+PRIORITY_PORTS = [
+    80, 23, 443, 21, 22, 25, 3389, 110, 445, 139, 143, 53, 135, 3306, 8080,
+    1723, 111, 995, 993, 5900, 1025, 587, 8888, 199, 1720, 465, 548, 113, 81,
+    6001, 10000, 514, 5060, 179, 1026, 2000, 8443, 8000, 32768, 554, 26, 1433,
+    49152, 2001, 515, 8008, 49154, 1027, 5666, 646, 5000, 5631, 631, 49153,
+    8081, 2049, 88, 79, 5800, 106, 2121, 1110, 49155, 6000, 513, 990, 5357,
+    427, 49156, 543, 544, 5101, 144, 7, 389, 8009, 3128, 444, 9999, 5009,
+    7070, 5190, 3000, 5432, 1900, 3986, 13, 1029, 9, 5051, 6646, 49157, 1028,
+    873, 1755, 2717, 4899, 9100, 119, 37, 1521, 2375, 5601, 6379, 9000, 9200,
+    11211, 27017, 8001, 8002, 8083, 8090, 8181, 8444, 8880, 9090, 9443,
+]
+
+def _top_ports(count):
+    ports = list(dict.fromkeys(PRIORITY_PORTS))
+    seen = set(ports)
+    for port in range(1, 65536):
+        if len(ports) >= count:
+            break
+        if port not in seen:
+            ports.append(port)
+    return ports[:count]
+
+PORT_PROFILES = {
+    "common": COMMON_PORTS,
+    "top100": _top_ports(100),
+    "top1000": _top_ports(1000),
+}
+
+# --- HELPER FUNCTIONS ---
+def get_hostname(target_url):
+    return target_url.replace("http://", "").replace("https://", "").split("/")[0].split(":")[0]
+
+def service_name(port):
+    if port in SERVICE_NAMES:
+        return SERVICE_NAMES[port]
+    try:
+        return socket.getservbyport(port, "tcp").upper()
+    except OSError:
+        return "Unknown"
+
+def resolve_host(hostname):
+    """Resolves once per sweep; every probe reuses the same address."""
+    family, _, _, _, sockaddr = socket.getaddrinfo(hostname, None, type=socket.SOCK_STREAM)[0]
+    return family, sockaddr
+
+async def _probe(family, sockaddr, port, timeout, limiter):
+    loop = asyncio.get_running_loop()
+    await limiter.acquire_async()
+    overloaded = False
+    sock = None
+    try:
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.setblocking(False)
+        await asyncio.wait_for(loop.sock_connect(sock, sockaddr[:1] + (port,) + sockaddr[2:]), timeout)
+        return True
+    except asyncio.TimeoutError:
+        return False  # filtered; says nothing about load
+    except OSError as e:
+        # Refused means closed. Running out of sockets or buffers means
+        # we are sending faster than this machine (or its NAT) can keep up.
+        overloaded = e.errno in OVERLOAD_ERRNOS
+        return False
+    finally:
+        if sock is not None:
+            sock.close()
+        limiter.release(error=overloaded)
+
+async def sweep_ports(hostname, ports, timeout=CONNECT_TIMEOUT, max_in_flight=MAX_IN_FLIGHT):
+    """
+    Async generator yielding each open port as soon as its connect succeeds.
+    At most `max_in_flight` connects are pending at once, so a sweep of N
+    filtered ports costs roughly N / max_in_flight timeouts. Connects are
+    paced by the host's shared TCP limiter, across all concurrent sweeps.
+    """
+    family, sockaddr = resolve_host(hostname)
+    limit = asyncio.Semaphore(max_in_flight)
+    limiter = get_limiter(hostname, "tcp", rate=HOST_RATE, max_rate=HOST_RATE,
+                          concurrency=MAX_IN_FLIGHT, max_concurrency=MAX_IN_FLIGHT)
+
+    async def check(port):
+        async with limit:
+            return port, await _probe(family, sockaddr, port, timeout, limiter)
+
+    tasks = [asyncio.ensure_future(check(port)) for port in ports]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            port, is_open = await next_done
+            if is_open:
+                yield port
+    finally:
+        for task in tasks:
+            task.cancel()
+
+async def _collect(hostname, ports):
+    return [port async for port in sweep_ports(hostname, ports)]
+
+def scan_ports(target_url, profile=None, ports=None):
     """
     Scans common ports to see if the server is exposed.
+    profile: "common", "top100" or "top1000" (ignored when `ports` is given).
     """
     # Clean the URL to get just the hostname
     try:
-        hostname = target_url.replace("http://", "").replace("https://", "").split("/")[0].split(":")[0]
+        hostname = get_hostname(target_url)
     except:
         return []
 
-    ports_to_check = {
-        21: "FTP",
-        22: "SSH",
-        80: "HTTP",
-        443: "HTTPS",
-        3306: "MySQL Database",
-        5000: "Dev Server",
-        8080: "Alt HTTP"
-    }
-    
-    open_ports = []
-    
-    # Fast scan with short timeout
-    for port, service in ports_to_check.items():
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(0.5) 
-        result = sock.connect_ex((hostname, port))
-        if result == 0:
-            open_ports.append(f"Port {port} ({service}) is OPEN")
-        sock.close()
-        
-    return open_ports
\ No newline at end of file
+    if ports is None:
+        ports = PORT_PROFILES.get(profile or DEFAULT_PROFILE, COMMON_PORTS)
+
+    try:
+        found = asyncio.run(_collect(hostname, ports))
+    except socket.gaierror:
+        return []
+
+    # Report in port order so results stay stable however the sweep finished
+    return [f"Port {port} ({service_name(port)}) is OPEN" for port in sorted(found)]
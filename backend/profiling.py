@@ -0,0 +1,153 @@
+import contextvars
+import cProfile
+import functools
+import hmac
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+
+# --- CONFIG: ON-DEMAND PROFILING ---
+ALWAYS = os.environ.get("SENTINEL_PROFILE", "0") == "1"          # profile every wrapped call, not just requested ones
+PROFILE_DIR = os.environ.get("SENTINEL_PROFILE_DIR", "profiles")
+SAMPLE_HZ = float(os.environ.get("SENTINEL_PROFILE_HZ", 100))     # all-thread stack samples per second; 0 turns sampling off
+TRACE_FRAMES = int(os.environ.get("SENTINEL_PROFILE_FRAMES", 25)) # traceback depth kept per allocation
+TOP_ALLOCATIONS = 40
+# Profiling slows every scan in the process, so per-request profiling is
+# only honoured for callers presenting this token; unset, it is refused.
+TOKEN = os.environ.get("SENTINEL_PROFILE_TOKEN")
+
+_session = contextvars.ContextVar("sentinel_profile", default=None)
+_tracing = 0  # sessions currently relying on tracemalloc
+_tracing_lock = threading.Lock()
+
+class _Sampler(threading.Thread):
+    """
+    Samples every thread's Python stack at SAMPLE_HZ. cProfile only sees
+    the thread that called the scan; this covers the module, injection and
+    crawler workers it fans out to. Other scans running in the same process
+    show up too, so profile a slow target on a quiet worker when possible.
+    """
+    def __init__(self, hz):
+        super().__init__(name="sentinel-profile-sampler", daemon=True)
+        self.interval = 1 / hz
+        self.stacks = {}
+        self.samples = 0
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == self.ident:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                # A pool worker waiting for work is idle, not slow
+                if stack and stack[0].startswith("_worker (thread.py"):
+                    continue
+                key = ";".join([names.get(ident, str(ident))] + stack[::-1])
+                self.stacks[key] = self.stacks.get(key, 0) + 1
+            self.samples += 1
+
+    def stop(self):
+        self._done.set()
+        self.join()
+
+class ProfileSession:
+    """
+    One profiled call: cProfile on the calling thread, the all-thread
+    sampler, and tracemalloc. Everything lands in PROFILE_DIR/<id>/.
+    """
+    def __init__(self, label):
+        self.label = label
+        self.id = f"{label}-{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self.path = os.path.abspath(os.path.join(PROFILE_DIR, self.id))
+
+    def start(self):
+        global _tracing
+        with _tracing_lock:
+            if _tracing == 0 and not tracemalloc.is_tracing():
+                tracemalloc.start(TRACE_FRAMES)
+                self._owns_tracing = True
+            else:
+                self._owns_tracing = False
+            _tracing += 1
+        self._sampler = _Sampler(SAMPLE_HZ) if SAMPLE_HZ > 0 else None
+        if self._sampler:
+            self._sampler.start()
+        self._started = time.monotonic()
+        self._profiler = cProfile.Profile()
+        self._profiler.enable()
+
+    def stop(self):
+        global _tracing
+        self._profiler.disable()
+        duration = time.monotonic() - self._started
+        if self._sampler:
+            self._sampler.stop()
+        snapshot = None
+        if tracemalloc.is_tracing():
+            # Leave out the profiler's own bookkeeping
+            snapshot = tracemalloc.take_snapshot().filter_traces([
+                tracemalloc.Filter(False, __file__), tracemalloc.Filter(False, tracemalloc.__file__)])
+        peak = tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else None
+        with _tracing_lock:
+            _tracing -= 1
+            if _tracing == 0 and self._owns_tracing:
+                tracemalloc.stop()
+
+        os.makedirs(self.path, exist_ok=True)
+        self._profiler.dump_stats(os.path.join(self.path, "cpu.prof"))
+        if self._sampler:
+            with open(os.path.join(self.path, "samples.folded"), "w", encoding="utf-8") as f:
+                f.writelines(f"{stack} {count}\n" for stack, count in sorted(self._sampler.stacks.items()))
+        if snapshot is not None:
+            snapshot.dump(os.path.join(self.path, "allocations.tracemalloc"))
+            with open(os.path.join(self.path, "allocations.txt"), "w", encoding="utf-8") as f:
+                f.write(f"peak traced: {peak / 1024:.0f} KiB\n\n")
+                f.writelines(f"{stat}\n" for stat in snapshot.statistics("lineno")[:TOP_ALLOCATIONS])
+        with open(os.path.join(self.path, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"id": self.id, "label": self.label, "duration_seconds": round(duration, 3),
+                       "sample_hz": SAMPLE_HZ, "samples": self._sampler.samples if self._sampler else 0,
+                       "peak_traced_bytes": peak}, f, indent=2)
+        print(f"[*] Profile for {self.label} saved to {self.path}")
+
+def request_allowed(token):
+    """Whether a caller presenting `token` may ask for a profile."""
+    return bool(TOKEN) and bool(token) and hmac.compare_digest(token.encode(), TOKEN.encode())
+
+def profiled(label):
+    """
+    Decorator adding a `profile` keyword to func: profile=True profiles
+    that call, as does SENTINEL_PROFILE=1 for every call. Off, it costs
+    one check per call. A dict result gains a `profile` entry with the
+    profile's id; the files are under PROFILE_DIR/<id>/ on the server.
+    """
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, profile=False, **kwargs):
+            if not (profile or ALWAYS) or _session.get() is not None:
+                return func(*args, **kwargs)
+            session = ProfileSession(label)
+            token = _session.set(session)
+            session.start()
+            try:
+                result = func(*args, **kwargs)
+            finally:
+                try:
+                    session.stop()
+                except Exception as e:
+                    print(f"[!] Could not save profile {session.id}: {e}")
+                _session.reset(token)
+            if isinstance(result, dict):
+                result["profile"] = {"id": session.id}
+            return result
+        return wrapper
+    return decorate
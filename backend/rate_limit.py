@@ -0,0 +1,172 @@
+import asyncio
+import email.utils
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+# --- CONFIG: PER-HOST RATE AND CONCURRENCY CONTROL ---
+ENABLED = os.environ.get("SENTINEL_RATE_LIMIT", "1") == "1"
+HTTP_RATE = float(os.environ.get("SENTINEL_HOST_RATE", 50))                  # starting requests/sec per host
+HTTP_RATE_MAX = float(os.environ.get("SENTINEL_HOST_RATE_MAX", 500))
+HTTP_CONCURRENCY = int(os.environ.get("SENTINEL_HOST_CONCURRENCY", 8))       # starting requests in flight per host
+HTTP_CONCURRENCY_MAX = int(os.environ.get("SENTINEL_HOST_CONCURRENCY_MAX", 64))
+MAX_RETRY_AFTER = float(os.environ.get("SENTINEL_MAX_RETRY_AFTER", 60))      # never pause a host longer than this
+BURST_SECONDS = 0.1          # bucket holds this many seconds' worth of tokens
+LATENCY_TOLERANCE = 2.0      # a response this many times slower than usual counts as congestion
+RATE_GROWTH = 1.02           # per healthy response
+BACKOFF = 0.5                # per overload signal
+
+# Status codes meaning "slow down". A plain 500 is not one of them: an
+# injection payload that crashes the app is a finding, not congestion.
+OVERLOAD_STATUSES = {429, 502, 503, 504}
+
+class HostLimiter:
+    """
+    Token bucket (requests/sec) plus an AIMD concurrency window for one host.
+    Healthy, steady-latency responses grow both; 429s, gateway errors and
+    timeouts halve them, latency spikes trim the window, and Retry-After
+    pauses the host.
+    """
+    def __init__(self, name, rate, max_rate, concurrency, max_concurrency, min_rate=1.0):
+        self.name = name
+        self.rate = rate
+        self.min_rate = min(min_rate, rate)
+        self.max_rate = max(max_rate, rate)
+        self.limit = float(concurrency)
+        self.max_limit = max(max_concurrency, concurrency)
+        self.tokens = self._burst()
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        self.latency = None  # moving average of healthy responses
+        self._refilled_at = time.monotonic()
+        self._backed_off_at = 0.0
+        self._cond = threading.Condition()
+
+    def _burst(self):
+        return max(1.0, self.rate * BURST_SECONDS)
+
+    def _try_acquire(self, now):
+        """0 when a slot was taken, else seconds to wait (None: wait for a release)."""
+        self.tokens = min(self._burst(), self.tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if self.in_flight >= int(self.limit):
+            return None
+        if self.tokens < 1:
+            return (1 - self.tokens) / self.rate
+        self.tokens -= 1
+        self.in_flight += 1
+        return 0
+
+    def acquire(self):
+        with self._cond:
+            while True:
+                wait_for = self._try_acquire(time.monotonic())
+                if wait_for == 0:
+                    return
+                self._cond.wait(timeout=1.0 if wait_for is None else wait_for)
+
+    async def acquire_async(self):
+        while True:
+            with self._cond:
+                wait_for = self._try_acquire(time.monotonic())
+            if wait_for == 0:
+                return
+            await asyncio.sleep(0.005 if wait_for is None else wait_for)
+
+    def release(self, status=None, latency=None, error=False, retry_after=None):
+        """
+        Reports how the request went. error=True means it timed out or the
+        connection failed; latency is in seconds, or None if not measured.
+        """
+        with self._cond:
+            self.in_flight -= 1
+            now = time.monotonic()
+            if error or status in OVERLOAD_STATUSES:
+                self._back_off(now, retry_after)
+            elif latency is not None and self.latency is not None and latency > self.latency * LATENCY_TOLERANCE:
+                # Queueing building up on the target: stop growing, ease off a little
+                self.limit = max(1.0, self.limit - 1)
+                self.latency = 0.8 * self.latency + 0.2 * latency
+            else:
+                if latency is not None:
+                    self.latency = latency if self.latency is None else 0.8 * self.latency + 0.2 * latency
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+                self.rate = min(self.max_rate, self.rate * RATE_GROWTH)
+            self._cond.notify_all()
+
+    def _back_off(self, now, retry_after):
+        if retry_after:
+            self.blocked_until = max(self.blocked_until, now + min(retry_after, MAX_RETRY_AFTER))
+        # Requests already in flight report the same congestion; count it once per round trip
+        if now - self._backed_off_at < (self.latency or 0.1):
+            return
+        self._backed_off_at = now
+        self.limit = max(1.0, self.limit * BACKOFF)
+        self.rate = max(self.min_rate, self.rate * BACKOFF)
+        print(f"[!] {self.name}: backing off to {int(self.limit)} concurrent, {self.rate:.0f} req/s")
+
+    def stats(self):
+        with self._cond:
+            return {"rate": round(self.rate, 1), "concurrency": int(self.limit), "in_flight": self.in_flight}
+
+class _Unlimited:
+    def acquire(self):
+        pass
+
+    async def acquire_async(self):
+        pass
+
+    def release(self, status=None, latency=None, error=False, retry_after=None):
+        pass
+
+_UNLIMITED = _Unlimited()
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+def get_limiter(host, kind="http", **settings):
+    """
+    The shared limiter for (kind, host). Every scan and module talking to a
+    host goes through the same one, so their combined load is what adapts.
+    settings override the HTTP defaults the first time a limiter is made.
+    """
+    if not ENABLED or not host:
+        return _UNLIMITED
+    key = (kind, host.lower())
+    limiter = _limiters.get(key)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.get(key)
+            if limiter is None:
+                options = {"rate": HTTP_RATE, "max_rate": HTTP_RATE_MAX,
+                           "concurrency": HTTP_CONCURRENCY, "max_concurrency": HTTP_CONCURRENCY_MAX}
+                options.update(settings)
+                limiter = _limiters[key] = HostLimiter(f"{kind}://{host}", **options)
+    return limiter
+
+def all_stats():
+    """{(kind, host): stats} for every limiter this process has made."""
+    with _limiters_lock:
+        limiters = list(_limiters.items())
+    return {key: limiter.stats() for key, limiter in limiters}
+
+def limiter_for_url(url):
+    try:
+        return get_limiter(urlsplit(url).netloc)
+    except ValueError:
+        return _UNLIMITED
+
+def parse_retry_after(value):
+    """Seconds from a Retry-After header (delta-seconds or HTTP-date), or None."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
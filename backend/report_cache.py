@@ -0,0 +1,119 @@
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# --- CONFIG: RENDERED REPORT CACHE ---
+REPORTS_DIR = "reports"
+RENDER_WORKERS = int(os.environ.get("SENTINEL_RENDER_WORKERS", 2))
+RENDER_TIMEOUT = float(os.environ.get("SENTINEL_RENDER_TIMEOUT", 120))
+MAX_CACHE_BYTES = int(os.environ.get("SENTINEL_REPORT_CACHE_MB", 200)) * 1024 * 1024
+MAX_AGE_SECONDS = float(os.environ.get("SENTINEL_REPORT_MAX_AGE", 7 * 24 * 3600))
+
+_pool = None
+_pool_lock = threading.Lock()
+_inflight = {}  # cache key -> Future of a render already under way
+_inflight_lock = threading.Lock()
+
+def report_filename(report_data, report_type='technical'):
+    # Lives here rather than in reporter so the web process never imports fpdf
+    target_clean = report_data.get('target', 'unknown').replace("http://", "").replace("https://", "")
+    clean_name = re.sub(r'[\\/*?:"<>|]', '_', target_clean)
+    suffix = "Executive" if report_type == 'executive' else "Technical"
+    return f"Sentinel_{suffix}_{clean_name}_{int(time.time())}.pdf"
+
+def report_key(report_data, report_type):
+    """
+    Content address of a rendered PDF. The scan date printed on the cover
+    is part of the key, so a cached copy never shows a stale date.
+    """
+    payload = json.dumps({"data": report_data, "type": report_type, "date": time.strftime('%Y-%m-%d')},
+                         sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+def _render(report_data, report_type, path, profile=False):
+    # Runs in a worker process; fpdf is only ever imported there
+    from reporter import generate_report
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    generate_report(report_data, report_type, output_path=tmp_path, profile=profile)
+    os.replace(tmp_path, path)
+    return path
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # spawn, not fork: the server process runs browser and scan threads
+                _pool = ProcessPoolExecutor(max_workers=RENDER_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+def shutdown_render_pool():
+    """Lets renders already running finish; queued ones are dropped."""
+    if _pool is not None:
+        _pool.shutdown(wait=True, cancel_futures=True)
+
+def get_report(report_data, report_type='technical', profile=False):
+    """
+    Returns the path of the PDF for this (report_data, report_type), rendering
+    it in the process pool only if no identical report is cached. Concurrent
+    requests for the same report wait on a single render. profile=True
+    skips the cache and profiles the render (see profiling.py).
+    """
+    os.makedirs(REPORTS_DIR, exist_ok=True)
+    key = report_key(report_data, report_type)
+    path = os.path.abspath(os.path.join(REPORTS_DIR, f"{key}.pdf"))
+
+    try:
+        if not profile:
+            os.utime(path)  # cache hit; mtime doubles as last-access time for eviction
+            return path
+    except OSError:
+        pass
+
+    with _inflight_lock:
+        future = _inflight.get(key)
+        owner = future is None
+        if owner:
+            future = _inflight[key] = _get_pool().submit(_render, report_data, report_type, path, profile)
+    try:
+        return future.result(timeout=RENDER_TIMEOUT)
+    finally:
+        if owner:
+            with _inflight_lock:
+                _inflight.pop(key, None)
+            evict_reports()
+
+def evict_reports():
+    """Drops reports older than MAX_AGE_SECONDS, then least recently used ones past MAX_CACHE_BYTES."""
+    now = time.time()
+    entries = []
+    for name in os.listdir(REPORTS_DIR):
+        path = os.path.join(REPORTS_DIR, name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        if not name.endswith(".pdf"):
+            continue
+        if now - stat.st_mtime > MAX_AGE_SECONDS:
+            _remove(path)
+        else:
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= MAX_CACHE_BYTES:
+            break
+        _remove(path)
+        total -= size
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
@@ -1,8 +1,9 @@
 from fpdf import FPDF
 import time
 import os
-import re
 import math
+import profiling
+from report_cache import report_filename
 
 class AdvancedPDF(FPDF):
     def header(self):
@@ -217,7 +218,8 @@ def aggregate_vulnerabilities(vulnerabilities):
     return list(groups.values())
 
 # --- MAIN GENERATOR ---
-def generate_report(report_data, report_type='technical'):
+@profiling.profiled("report")
+def generate_report(report_data, report_type='technical', output_path=None):
     pdf = AdvancedPDF()
     pdf.add_page()
     pdf.set_auto_page_break(auto=True, margin=15)
@@ -366,10 +368,7 @@ def generate_report(report_data, report_type='technical'):
     if not os.path.exists("reports"):
         os.makedirs("reports")
     
-    target_clean = report_data.get('target', 'unknown').replace("http://", "").replace("https://", "")
-    clean_name = re.sub(r'[\\/*?:"<>|]', '_', target_clean)
-    suffix = "Executive" if report_type == 'executive' else "Technical"
-    filename = f"reports/Sentinel_{suffix}_{clean_name}_{int(time.time())}.pdf"
+    filename = output_path or f"reports/{report_filename(report_data, report_type)}"
     
     pdf.output(filename)
     return filename
\ No newline at end of file
@@ -0,0 +1,84 @@
+import json
+import threading
+import weakref
+
+HEARTBEAT_SECONDS = 15
+
+_open_streams = weakref.WeakSet()  # so shutdown can end every stream still being followed
+_open_lock = threading.Lock()
+
+class EventStream:
+    """
+    Append-only log of events for one scan. Producers emit from any thread;
+    each SSE client replays the log from the start and then follows it live,
+    so late subscribers still see every finding.
+    """
+    def __init__(self):
+        self._events = []
+        self._closed = False
+        self._cond = threading.Condition()
+        with _open_lock:
+            _open_streams.add(self)
+
+    def emit(self, event, data):
+        with self._cond:
+            if self._closed:
+                return
+            self._events.append((event, data))
+            self._cond.notify_all()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        with _open_lock:
+            _open_streams.discard(self)
+
+    def iter_sse(self):
+        """Yields Server-Sent Events text frames until the stream is closed."""
+        sent = 0
+        while True:
+            with self._cond:
+                if sent == len(self._events) and not self._closed:
+                    self._cond.wait(timeout=HEARTBEAT_SECONDS)
+                batch = self._events[sent:]
+                closed = self._closed
+            if not batch and not closed:
+                # Comment frame keeps proxies from closing an idle connection
+                yield ": keep-alive\n\n"
+            for event, data in batch:
+                yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+            sent += len(batch)
+            if closed and sent == len(self._events):
+                return
+
+def close_all_streams(event=None, data=None):
+    """Emits a last `event` to every open stream, then closes them all, ending their SSE responses."""
+    with _open_lock:
+        streams = list(_open_streams)
+    for stream in streams:
+        if event is not None:
+            stream.emit(event, data)
+        stream.close()
+    return len(streams)
+
+class FindingList(list):
+    """A findings list that reports each finding the moment it is appended."""
+    def __init__(self, on_finding=None):
+        super().__init__()
+        self.on_finding = on_finding
+
+    def append(self, finding):
+        super().append(finding)
+        if self.on_finding:
+            self.on_finding(finding)
+
+    def extend(self, findings):
+        for finding in findings:
+            self.append(finding)
+
+def finding_emitter(on_event):
+    """Adapts an on_event(event, data) callback to an on_finding(finding) one."""
+    if on_event is None:
+        return None
+    return lambda finding: on_event("finding", finding)
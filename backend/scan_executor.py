@@ -0,0 +1,123 @@
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# --- CONFIG: CONCURRENT MODULE EXECUTION ---
+# Every quick scan fans out its modules onto this shared pool, so the pool
+# size caps how many module calls run across all in-flight scans.
+MAX_WORKERS = int(os.environ.get("SENTINEL_SCAN_WORKERS", 32))
+MODULE_TIMEOUT = float(os.environ.get("SENTINEL_MODULE_TIMEOUT", 20))
+
+_pool = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="sentinel-module")
+
+class ScanCancelled(Exception):
+    """Raised by a scan at a phase boundary once its cancel event is set."""
+
+def check_cancelled(cancel_event):
+    if cancel_event is not None and cancel_event.is_set():
+        raise ScanCancelled()
+
+_current_call = contextvars.ContextVar("sentinel_module_call", default=None)
+
+class ModuleCall:
+    """
+    One module call running in a ModuleBatch. Code under the module reads
+    it through current_call() to stop early once the batch has stopped
+    waiting, and to flag a result that isn't a complete run.
+    """
+    def __init__(self, timeout):
+        self.deadline = time.monotonic() + timeout
+        self.complete = True
+
+    def expired(self):
+        return time.monotonic() >= self.deadline
+
+    def mark_incomplete(self):
+        self.complete = False
+
+def current_call():
+    """The ModuleCall running in this context, or None outside a ModuleBatch."""
+    return _current_call.get()
+
+class ModuleBatch:
+    """
+    A set of module calls that can keep growing while earlier ones run, e.g.
+    as a crawler discovers pages. Each call gets `timeout` seconds from the
+    moment a worker picks it up, so a long queue doesn't eat into it.
+    on_result(name, result) fires from the worker thread as each call finishes.
+    """
+    def __init__(self, timeout=MODULE_TIMEOUT, on_result=None):
+        self.timeout = timeout
+        self.on_result = on_result
+        self.results = {}
+        self._started = {}
+        self._settled = set()  # finished, failed or abandoned
+        self._cond = threading.Condition()
+
+    def submit(self, name, func, *args):
+        with self._cond:
+            self.results[name] = None
+        # The call runs in a copy of the caller's context, so per-scan state
+        # (e.g. telemetry phases) follows it onto the worker
+        return _pool.submit(contextvars.copy_context().run, self._run, name, func, args)
+
+    def _run(self, name, func, args):
+        call = ModuleCall(self.timeout)
+        with self._cond:
+            self._started[name] = time.monotonic()
+        _current_call.set(call)  # this worker runs in a context copied for this call
+        try:
+            result = func(*args)
+        except Exception as e:
+            print(f"[!] Module '{name}' failed: {e}")
+            result = None
+        else:
+            with self._cond:
+                late = name in self._settled
+                if not late:
+                    self.results[name] = result
+            if not late and self.on_result:
+                self.on_result(name, result)
+        finally:
+            with self._cond:
+                self._settled.add(name)
+                self._cond.notify_all()
+        return result
+
+    def join(self):
+        """
+        Waits for every submitted call. One that raises or overruns its
+        timeout maps to None. Returns {name: result}.
+        """
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                waiting = [name for name in self.results if name not in self._settled]
+                for name in waiting:
+                    if name in self._started and now - self._started[name] >= self.timeout:
+                        # The worker keeps running until the module's own
+                        # socket timeouts fire; we simply stop waiting for it.
+                        self._settled.add(name)
+                        print(f"[!] Module '{name}' timed out after {self.timeout}s")
+                waiting = [name for name in waiting if name not in self._settled]
+                if not waiting:
+                    return dict(self.results)
+                # Calls still queued have no deadline yet, so re-check soon
+                deadlines = [self._started[name] + self.timeout for name in waiting if name in self._started]
+                wait_for = min(deadlines) - now if len(deadlines) == len(waiting) else 0.25
+                self._cond.wait(timeout=max(0.01, wait_for))
+
+def run_concurrently(tasks, timeout=MODULE_TIMEOUT, on_result=None):
+    """
+    Runs independent scan modules in parallel.
+    tasks: list of (name, func, args) tuples.
+    on_result: optional callback(name, result), called in completion order.
+    Returns {name: result}. A module that raises or exceeds its timeout maps to
+    None, so one broken module never takes the rest of the scan down with it.
+    """
+    batch = ModuleBatch(timeout, on_result)
+    for name, func, args in tasks:
+        batch.submit(name, func, *args)
+    return batch.join()
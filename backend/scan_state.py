@@ -0,0 +1,170 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from scan_executor import current_call
+
+# --- CONFIG: INCREMENTAL RESCAN STATE ---
+STATE_DB = os.environ.get("SENTINEL_STATE_DB", "scan_state.db")
+STATE_MAX_AGE = float(os.environ.get("SENTINEL_STATE_MAX_AGE", 30 * 24 * 3600))  # forget pages not seen for this long
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    body_hash TEXT NOT NULL,
+    extraction TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    url TEXT NOT NULL,
+    module TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    result TEXT,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (url, module)
+);
+CREATE TABLE IF NOT EXISTS scripts (
+    url TEXT PRIMARY KEY,
+    validators TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    endpoints TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS scripts_by_digest ON scripts (digest);
+"""
+
+def body_hash(content):
+    return hashlib.sha256(content).hexdigest()
+
+def forms_fingerprint(forms):
+    """Changes only when a form's action, method or set of inputs does."""
+    shape = [[f["action"], f["method"], [[i["type"], i["name"], i["value"]] for i in f["inputs"]]] for f in forms]
+    return hashlib.sha256(json.dumps(shape).encode()).hexdigest()
+
+class PageRecord:
+    def __init__(self, url, etag, last_modified, body_hash, extraction):
+        self.url = url
+        self.etag = etag
+        self.last_modified = last_modified
+        self.body_hash = body_hash
+        self.extraction = extraction  # dict form of html_extract.Extraction
+
+    def conditional_headers(self):
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+class ScanState:
+    """
+    What earlier scans learned about each URL: validators and body hash,
+    the page's extracted forms/scripts/links, and the results of the
+    expensive modules. Lets a rescan skip unchanged pages and scripts.
+    """
+    def __init__(self, path=STATE_DB):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def page(self, url):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, body_hash, extraction FROM pages WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            return None
+        return PageRecord(url, row[0], row[1], row[2], json.loads(row[3]))
+
+    def record_page(self, url, etag, last_modified, body_hash, extraction):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, body_hash, json.dumps(extraction), time.time()))
+
+    def touch_page(self, url):
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE pages SET updated_at = ? WHERE url = ?", (time.time(), url))
+
+    def result(self, url, module, fingerprint):
+        """Returns (True, result) if module last ran on this exact fingerprint."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result FROM results WHERE url = ? AND module = ? AND fingerprint = ?",
+                (url, module, fingerprint)).fetchone()
+        if row is None:
+            return False, None
+        return True, json.loads(row[0])
+
+    def record_result(self, url, module, fingerprint, result):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                (url, module, fingerprint, json.dumps(result), time.time()))
+
+    def script(self, url):
+        """Returns (validator headers, digest) for a script seen before, or None."""
+        with self._lock:
+            row = self._conn.execute("SELECT validators, digest FROM scripts WHERE url = ?", (url,)).fetchone()
+        return None if row is None else (json.loads(row[0]), row[1])
+
+    def script_endpoints(self, digest):
+        with self._lock:
+            row = self._conn.execute("SELECT endpoints FROM scripts WHERE digest = ? LIMIT 1", (digest,)).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def record_script(self, url, validators, digest, endpoints):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO scripts VALUES (?, ?, ?, ?, ?)",
+                (url, json.dumps(validators), digest, json.dumps(endpoints), time.time()))
+
+    def prune(self, max_age=STATE_MAX_AGE):
+        cutoff = time.time() - max_age
+        with self._lock, self._conn:
+            for table in ("pages", "results", "scripts"):
+                self._conn.execute(f"DELETE FROM {table} WHERE updated_at < ?", (cutoff,))
+
+_state = None
+_state_lock = threading.Lock()
+
+def get_scan_state():
+    """The process-wide ScanState, opened (and pruned) on first use."""
+    global _state
+    if _state is None:
+        with _state_lock:
+            if _state is None:
+                state = ScanState()
+                state.prune()
+                _state = state
+    return _state
+
+def reuse_result(state, name, module, fingerprint_of):
+    """
+    Wraps a page module so it only runs when fingerprint_of(doc) differs
+    from the last run on that URL; otherwise the stored result is returned.
+    """
+    from page_cache import fetch_document
+
+    def run(url, cache=None):
+        try:
+            fingerprint = fingerprint_of(fetch_document(url, cache))
+        except Exception:
+            return module(url, cache)
+        found, result = state.result(url, name, fingerprint)
+        if found:
+            return result
+        result = module(url, cache)
+        # A timed-out or failed run found nothing because it tested nothing;
+        # storing that would hide the page until its forms change
+        call = current_call()
+        if call is None or (call.complete and not call.expired()):
+            state.record_result(url, name, fingerprint, result)
+        return result
+    return run
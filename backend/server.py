@@ -1,21 +1,138 @@
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Response, request, jsonify, send_file
 from flask_cors import CORS
 from scanner_logic import scan_sql_injection, scan_xss, scan_shadow_apis
 from port_scanner import scan_ports
-from reporter import generate_report
-from deep_scanner import run_deep_scan
+from report_cache import get_report, report_filename, shutdown_render_pool
 # IMPORT DATABASE SAVER
-from database import save_scan_result
-import requests
-import re
+from database import save_scan_result, list_scan_history, get_scan_record, flush_history
+from storage import PAGE_SIZE, MAX_PAGE_SIZE
+from auth import auth_enabled, verified_user_id
+from scan_executor import run_concurrently, ModuleBatch
+from page_cache import PageCache, fetch_document
+from browser_pool import warm_browser_pool, active_contexts
+from jobs import deep_scan_jobs, QueueFull, ShuttingDown
+from deep_workers import get_deep_pool, shutdown_deep_pool
+from batch import batch_scans
+from scan_events import EventStream, close_all_streams
+from crawler import crawl as crawl_site
+from scan_state import get_scan_state, reuse_result, forms_fingerprint
+import profiling
+import rate_limit
+import telemetry
+import os
 import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# --- CONFIG: SHUTDOWN ---
+SHUTDOWN_TIMEOUT = float(os.environ.get("SENTINEL_SHUTDOWN_TIMEOUT", 30))  # running deep scans get this long to finish
+
+# --- CONFIG: REQUEST THREAD BUDGET ---
+# An SSE client holds its request thread until the scan it follows ends, so
+# streams may only take MAX_STREAMS threads; quick scans run on their own
+# pool and the remaining request threads stay free to serve them
+# (gunicorn.conf.py sizes the server's threads from these).
+MAX_STREAMS = int(os.environ.get("SENTINEL_MAX_STREAMS", 32))
+QUICK_SCAN_WORKERS = int(os.environ.get("SENTINEL_QUICK_SCANS", 16))  # quick scans running at once
+
+_quick_scans = ThreadPoolExecutor(max_workers=QUICK_SCAN_WORKERS, thread_name_prefix="sentinel-quick")
+_stream_slots = threading.BoundedSemaphore(MAX_STREAMS)
 
 app = Flask(__name__)
 CORS(app)
 
+def warm_up():
+    """
+    Starts Chromium so the first deep scan doesn't pay for the launch; with
+    a deep scan process pool, the browsers live in those processes. Called
+    by whatever serves the app (the __main__ block, gunicorn's
+    post_worker_init), never on import: spawned render workers and the
+    reloader's parent import this module too.
+    """
+    if os.environ.get("SENTINEL_WARM_BROWSERS", "1") != "1":
+        return
+    if get_deep_pool() is not None:
+        get_deep_pool().warm()
+    else:
+        warm_browser_pool()
+
 def health_check():
     return "Sentinel Active", 200
 
+# --- METRICS: PROCESS GAUGES ---
+telemetry.Gauge("sentinel_deep_jobs", "Deep scan jobs by status; 'queued' is the queue depth.",
+                lambda: {(status,): count for status, count in deep_scan_jobs.stats().items()}, ("status",))
+telemetry.Gauge("sentinel_batch_targets", "Batch scan targets waiting for a slot or scanning.",
+                lambda: {(status,): count for status, count in batch_scans.stats().items()}, ("status",))
+telemetry.Gauge("sentinel_browser_contexts_active", "Browser contexts in use by deep scans.", active_contexts)
+
+def host_limits(stat):
+    """One field of every per-host limiter's stats(), keyed by (kind, host)."""
+    return lambda: {key: stats[stat] for key, stats in rate_limit.all_stats().items()}
+
+telemetry.Gauge("sentinel_host_rate", "Request rate each target host is currently allowed (req/s).",
+                host_limits("rate"), ("kind", "host"))
+telemetry.Gauge("sentinel_host_concurrency", "Concurrency window each target host is currently allowed.",
+                host_limits("concurrency"), ("kind", "host"))
+telemetry.Gauge("sentinel_host_in_flight", "Requests in flight per target host.",
+                host_limits("in_flight"), ("kind", "host"))
+
+def run_deep_scan(*args, **kwargs):
+    # In production deep scans run in their own processes (deep_workers.py).
+    # Otherwise the deep scanner is imported on first use, so workers that
+    # only serve quick scans never load it or the code behind it.
+    pool = get_deep_pool()
+    if pool is not None:
+        return pool.run(*args, **kwargs)
+    from deep_scanner import run_deep_scan as deep_scan
+    return deep_scan(*args, **kwargs)
+
+_shutdown_lock = threading.Lock()
+_shutdown_started = False
+_shutdown_done = threading.Event()
+
+def shutdown(timeout=SHUTDOWN_TIMEOUT):
+    """
+    Graceful stop: refuse new jobs and batches and end every open event
+    stream, so the WSGI server's own wait for open requests can finish;
+    let running scans finish within `timeout`, then stop the deep scan and
+    render processes and flush queued history rows. A second call (e.g.
+    gunicorn's worker_exit after the SIGTERM hook) waits for the first.
+    """
+    global _shutdown_started
+    with _shutdown_lock:
+        first, _shutdown_started = not _shutdown_started, True
+    if not first:
+        _shutdown_done.wait()
+        return
+    print(f"[*] Shutting down, waiting up to {timeout:.0f}s for running scans...")
+    try:
+        batches = threading.Thread(target=batch_scans.shutdown, args=(timeout,), name="sentinel-batch-shutdown")
+        batches.start()
+        # Watchers learn the server is going away instead of holding their
+        # request threads open until their scan ends
+        close_all_streams("error", {"error": "Server is restarting"})
+        deep_scan_jobs.shutdown(timeout)
+        batches.join()
+        _quick_scans.shutdown(wait=False, cancel_futures=True)
+        shutdown_deep_pool()
+        shutdown_render_pool()
+        flush_history()
+    finally:
+        _shutdown_done.set()
+    print("[*] Shutdown complete")
+
+def begin_shutdown(timeout=SHUTDOWN_TIMEOUT):
+    """Runs shutdown() in the background, e.g. from a SIGTERM handler, and returns at once."""
+    threading.Thread(target=shutdown, args=(timeout,), name="sentinel-shutdown", daemon=True).start()
+
+def profile_allowed():
+    """Per-request profiling needs SENTINEL_PROFILE_TOKEN in the X-Sentinel-Profile-Token header."""
+    return profiling.request_allowed(request.headers.get('X-Sentinel-Profile-Token'))
+
+def profile_refused():
+    return jsonify({"error": "Profiling requires a valid X-Sentinel-Profile-Token"}), 403
+
 # --- HELPER: Risk Calculation ---
 def calculate_dynamic_risk(vuln_type, severity):
     cvss_map = {
@@ -30,14 +147,11 @@ def calculate_dynamic_risk(vuln_type, severity):
     financial_impact = base_asset_value * math.exp(score / 2.5)
     return round(score, 1), round(financial_impact, 2)
 
-def scan_page_content(url):
+def scan_page_content(url, cache=None):
     findings = []
     try:
-        response = requests.get(url, timeout=5)
-        content = response.text
-        
-        # Simple Regex to find exposed emails (PII)
-        emails = set(re.findall(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}', content))
+        # Exposed emails (PII), collected in the page's single extraction pass
+        emails = fetch_document(url, cache, timeout=5).emails
         if emails:
             valid_emails = [e for e in emails if "example.com" not in e and "uilib" not in e and "node_modules" not in e]
             if valid_emails:
@@ -54,137 +168,427 @@ def scan_page_content(url):
 
 @app.route('/api/scan', methods=['POST'])
 def run_quick_scan():
-    """Lightweight scan (~5 seconds)."""
+    """Lightweight scan (modules run concurrently, ~slowest module)."""
     data = request.json
     target_url = data.get('url')
     user_id = data.get('user_id')  # <--- CAPTURE USER ID
+    crawl = bool(data.get('crawl'))  # follow same-origin links and scan every page
+    incremental = bool(data.get('incremental'))  # skip work on pages unchanged since the last scan
+    profile = bool(data.get('profile'))  # save a CPU/allocation profile of this scan (see profiling.py)
 
     if not target_url: return jsonify({"error": "No URL provided"}), 400
+    if profile and not profile_allowed(): return profile_refused()
     if not target_url.startswith('http'): target_url = 'https://' + target_url
 
-    # Run the scan logic
-    report = perform_quick_scan(target_url)
+    # Run the scan logic on the quick scan pool; this thread just waits for it
+    try:
+        scan = _quick_scans.submit(perform_quick_scan, target_url, crawl=crawl, incremental=incremental, profile=profile)
+    except RuntimeError:  # the pool is shut down
+        return jsonify({"error": "Server is restarting, try again shortly"}), 503
+    report = scan.result()
 
     # SAVE TO DATABASE IF USER IS LOGGED IN
     if user_id:
+        save_quick_scan(user_id, target_url, report)
+
+    return jsonify(report)
+
+@app.route('/api/scan/stream', methods=['GET'])
+def stream_quick_scan():
+    """Quick scan as Server-Sent Events: findings arrive as modules finish."""
+    target_url = request.args.get('url')
+    user_id = request.args.get('user_id')
+    crawl = request.args.get('crawl') in ("1", "true")
+    incremental = request.args.get('incremental') in ("1", "true")
+    profile = request.args.get('profile') in ("1", "true")
+
+    if not target_url: return jsonify({"error": "No URL provided"}), 400
+    if profile and not profile_allowed(): return profile_refused()
+    if not target_url.startswith('http'): target_url = 'https://' + target_url
+
+    events = EventStream()
+
+    def run():
         try:
-            # Calculate Risk Score for History
-            high = report['summary']['high']
-            med = report['summary']['medium']
-            low = report['summary']['low']
-            risk_score = min(100, (high * 25) + (med * 10) + (low * 2))
-
-            save_scan_result(
-                user_id=user_id,
-                target_url=target_url,
-                mode="Quick",
-                risk_score=risk_score,
-                vulns_found=len(report['vulnerabilities']),
-                report_json=report
-            )
-            print(f"[*] Quick Scan saved for user {user_id}")
+            report = perform_quick_scan(target_url, on_event=events.emit, crawl=crawl,
+                                        incremental=incremental, profile=profile)
+            if user_id:
+                save_quick_scan(user_id, target_url, report)
         except Exception as e:
-            print(f"[!] Database Error: {e}")
+            print(f"[!] Streaming scan failed: {e}")
+            events.emit("error", {"error": "Scan failed"})
+        finally:
+            events.close()
 
-    return jsonify(report)
+    try:
+        return sse_response(events, start=lambda: _quick_scans.submit(run))
+    except RuntimeError:  # the pool is shut down
+        return jsonify({"error": "Server is restarting, try again shortly"}), 503
+
+def save_quick_scan(user_id, target_url, report):
+    try:
+        # Calculate Risk Score for History
+        high = report['summary']['high']
+        med = report['summary']['medium']
+        low = report['summary']['low']
+        risk_score = min(100, (high * 25) + (med * 10) + (low * 2))
+
+        save_scan_result(
+            user_id=user_id,
+            target_url=target_url,
+            mode="Quick",
+            risk_score=risk_score,
+            vulns_found=len(report['vulnerabilities']),
+            report_json=report
+        )
+        print(f"[*] Quick Scan queued for saving (user {user_id})")
+    except Exception as e:
+        print(f"[!] Database Error: {e}")
+
+def sse_response(events, start=None):
+    """
+    Streams `events` to the client, holding one of the MAX_STREAMS stream
+    slots until the response closes. start() runs once a slot is secured.
+    """
+    if not _stream_slots.acquire(blocking=False):
+        return jsonify({"error": "Too many open event streams, try again shortly"}), 503
+    try:
+        if start: start()
+    except BaseException:
+        _stream_slots.release()
+        raise
+    response = Response(events.iter_sse(), mimetype="text/event-stream",
+                        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+    response.call_on_close(_stream_slots.release)
+    return response
 
 @app.route('/api/deep-scan', methods=['POST'])
 def handle_deep_scan():
-    """Heavyweight scan (Playwright)."""
+    """Heavyweight scan (Playwright). Queued as a job; returns its id at once."""
     data = request.json
     target_url = data.get('url')
     user_id = data.get('user_id') # <--- CAPTURE USER ID
+    profile = bool(data.get('profile'))
 
     if not target_url: return jsonify({"error": "No URL provided"}), 400
+    if profile and not profile_allowed(): return profile_refused()
     if not target_url.startswith('http'): target_url = 'https://' + target_url
 
     try:
         # Pass user_id to the deep scanner orchestrator
-        report = run_deep_scan(target_url, user_id=user_id)
-        return jsonify(report)
-    except Exception as e:
-        print(f"Deep Scan Error: {e}")
-        return jsonify({"error": "Deep scan failed to initialize"}), 500
+        job = deep_scan_jobs.submit("deep", target_url, run_deep_scan, target_url, user_id=user_id, profile=profile)
+    except QueueFull:
+        return jsonify({"error": "Too many deep scans queued, try again shortly"}), 429
+    except ShuttingDown:
+        return jsonify({"error": "Server is restarting, try again shortly"}), 503
+    return jsonify(job.to_dict()), 202
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    job = deep_scan_jobs.get(job_id)
+    if not job: return jsonify({"error": "Unknown job"}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/api/jobs/<job_id>/result', methods=['GET'])
+def get_job_result(job_id):
+    job = deep_scan_jobs.get(job_id)
+    if not job: return jsonify({"error": "Unknown job"}), 404
+    if job.status == "done": return jsonify(job.result)
+    if job.status == "failed": return jsonify({"error": "Deep scan failed", **job.to_dict()}), 500
+    if job.status == "cancelled": return jsonify(job.to_dict()), 410
+    return jsonify(job.to_dict()), 202
+
+@app.route('/api/jobs/<job_id>/events', methods=['GET'])
+def stream_job_events(job_id):
+    """Replays the job's findings so far, then streams the rest live."""
+    job = deep_scan_jobs.get(job_id)
+    if not job: return jsonify({"error": "Unknown job"}), 404
+    return sse_response(job.events)
+
+@app.route('/api/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    job = deep_scan_jobs.cancel(job_id)
+    if not job: return jsonify({"error": "Unknown job"}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/api/batch', methods=['POST'])
+def submit_batch():
+    """Scans a list of targets in the background; poll the batch for progress."""
+    data = request.json or {}
+    targets = data.get('targets') or []
+    mode = data.get('mode', 'quick')
+    user_id = data.get('user_id')
+    crawl = bool(data.get('crawl'))
+
+    if not isinstance(targets, list) or not targets: return jsonify({"error": "No targets provided"}), 400
+    if mode not in ("quick", "deep"): return jsonify({"error": "Mode must be 'quick' or 'deep'"}), 400
+    urls = []
+    for target in targets:
+        if not isinstance(target, str) or not target.strip(): continue
+        target = target.strip()
+        urls.append(target if target.startswith('http') else 'https://' + target)
+    if not urls: return jsonify({"error": "No valid targets provided"}), 400
+
+    if mode == "deep":
+        def scan(url, cancel_event):
+            return run_deep_scan(url, user_id=user_id, cancel_event=cancel_event)
+    else:
+        def scan(url, cancel_event):
+            report = perform_quick_scan(url, crawl=crawl)
+            if user_id:
+                save_quick_scan(user_id, url, report)
+            return report
+
+    try:
+        batch = batch_scans.submit(mode, urls, scan)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except ShuttingDown:
+        return jsonify({"error": "Server is restarting, try again shortly"}), 503
+    return jsonify(batch.to_dict(limit=0)), 202
+
+@app.route('/api/batch/<batch_id>', methods=['GET'])
+def get_batch(batch_id):
+    """Aggregate progress plus one page of per-target status (offset/limit)."""
+    batch = batch_scans.get(batch_id)
+    if not batch: return jsonify({"error": "Unknown batch"}), 404
+    try:
+        offset = max(int(request.args.get('offset', 0)), 0)
+        limit = min(max(int(request.args.get('limit', 100)), 0), 1000)
+    except ValueError:
+        return jsonify({"error": "Invalid offset or limit"}), 400
+    return jsonify(batch.to_dict(offset, limit))
+
+@app.route('/api/batch/<batch_id>/targets/<int:index>', methods=['GET'])
+def get_batch_target(batch_id, index):
+    batch = batch_scans.get(batch_id)
+    if not batch: return jsonify({"error": "Unknown batch"}), 404
+    if index >= len(batch.targets): return jsonify({"error": "Unknown target"}), 404
+    target = batch.targets[index]
+    if target.status != "done": return jsonify(target.to_dict()), 202 if target.status in ("queued", "running") else 200
+    return jsonify({**target.to_dict(), "report": target.result})
+
+@app.route('/api/batch/<batch_id>', methods=['DELETE'])
+def cancel_batch(batch_id):
+    batch = batch_scans.cancel(batch_id)
+    if not batch: return jsonify({"error": "Unknown batch"}), 404
+    return jsonify(batch.to_dict(limit=0))
+
+def history_user():
+    """(user id, error response) for the history routes: the caller's own verified Supabase user."""
+    if not auth_enabled():
+        return None, (jsonify({"error": "History API is disabled: no way to verify callers is configured"}), 404)
+    user_id = verified_user_id(request.headers.get('Authorization'))
+    if not user_id:
+        return None, (jsonify({"error": "A valid Supabase access token is required"}), 401)
+    return user_id, None
+
+@app.route('/api/history', methods=['GET'])
+def list_history():
+    """The caller's scans, newest first. Pass back next_cursor to get the next page."""
+    user_id, error = history_user()
+    if error: return error
+    try:
+        limit = min(max(int(request.args.get('limit', PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+        scans, next_cursor = list_scan_history(user_id, limit, request.args.get('cursor'), request.args.get('target_url'))
+    except ValueError:
+        return jsonify({"error": "Invalid limit or cursor"}), 400
+    return jsonify({"scans": scans, "next_cursor": next_cursor})
+
+@app.route('/api/history/<int:scan_id>', methods=['GET'])
+def get_history_entry(scan_id):
+    user_id, error = history_user()
+    if error: return error
+    scan = get_scan_record(user_id, scan_id)
+    if not scan: return jsonify({"error": "Unknown scan"}), 404
+    return jsonify(scan)
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus scrape endpoint. Each worker process reports its own counts."""
+    return Response(telemetry.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
 
 @app.route('/api/download-report', methods=['POST'])
 def download_report():
     data = request.json
     report_type = data.get('report_type', 'technical')
-    report_data = {k:v for k,v in data.items() if k != 'report_type'}
+    profile = bool(data.get('profile'))
+    report_data = {k:v for k,v in data.items() if k not in ('report_type', 'profile')}
     
     if not report_data or 'vulnerabilities' not in report_data:
         return jsonify({"error": "No valid report data provided"}), 400
+    if profile and not profile_allowed(): return profile_refused()
     
     try:
-        pdf_path = generate_report(report_data, report_type)
-        return send_file(pdf_path, as_attachment=True)
+        # Identical requests are served from the cache; renders happen off-thread
+        pdf_path = get_report(report_data, report_type, profile=profile)
+        return send_file(pdf_path, as_attachment=True, download_name=report_filename(report_data, report_type))
     except Exception as e:
         print(f"Report error: {e}")
         return jsonify({"error": "Failed"}), 500
 
-# --- QUICK SCAN LOGIC ---
-def perform_quick_scan(target_url):
-    report = {
-        "target": target_url,
-        "vulnerabilities": [],
-        "summary": {"high": 0, "medium": 0, "low": 0},
-        "financial_risk_total": 0
-    }
-
-    print(f"[*] Running Quick Scan for {target_url}...")
-
-    # 1. LIVE PII SCAN
-    pii_findings = scan_page_content(target_url)
-    for pii in pii_findings:
+# --- QUICK SCAN FINDING FORMATTERS ---
+# 1. LIVE PII SCAN
+def format_pii(pii_findings):
+    vulns = []
+    for pii in pii_findings or []:
         cvss, cost = calculate_dynamic_risk("PII Exposure", pii['severity'])
-        report["vulnerabilities"].append({
+        vulns.append({
             "type": "PII Exposure", "details": pii['details'], "severity": pii['severity'],
             "fix": pii['fix'], "cvss": cvss, "est_cost": cost
         })
+    return vulns
 
-    # 2. PORT SCAN
-    try:
-        ports = scan_ports(target_url)
-        for p in ports:
-            # Extract port number
-            port_num = ''.join(filter(str.isdigit, p.split(' ')[1])) 
-            cvss, cost = calculate_dynamic_risk("Network Exposure", "Low")
-            report["vulnerabilities"].append({
-                "type": "Network Exposure", "details": p, "severity": "Low",
-                "fix": f"""# PORT CLOSURE PROCEDURE\n# ---------------------------------------------------\n# STEP 1: IDENTIFY PROCESS\nsudo lsof -i :{port_num}\n\n# STEP 2: STOP SERVICE (If not required)\nsudo systemctl stop <service_name>\nsudo systemctl disable <service_name>\n\n# STEP 3: UPDATE FIREWALL (UFW)\nsudo ufw deny {port_num}/tcp\nsudo ufw reload""",
-                "cvss": cvss, "est_cost": cost
-            })
-    except: pass
+# 2. PORT SCAN
+def format_ports(ports):
+    vulns = []
+    for p in ports or []:
+        # Extract port number
+        port_num = ''.join(filter(str.isdigit, p.split(' ')[1])) 
+        cvss, cost = calculate_dynamic_risk("Network Exposure", "Low")
+        vulns.append({
+            "type": "Network Exposure", "details": p, "severity": "Low",
+            "fix": f"""# PORT CLOSURE PROCEDURE\n# ---------------------------------------------------\n# STEP 1: IDENTIFY PROCESS\nsudo lsof -i :{port_num}\n\n# STEP 2: STOP SERVICE (If not required)\nsudo systemctl stop <service_name>\nsudo systemctl disable <service_name>\n\n# STEP 3: UPDATE FIREWALL (UFW)\nsudo ufw deny {port_num}/tcp\nsudo ufw reload""",
+            "cvss": cvss, "est_cost": cost
+        })
+    return vulns
 
-    # 3. REGEX SQLi SCAN
-    sqli = scan_sql_injection(target_url)
+# 3. REGEX SQLi SCAN
+def format_sqli(sqli):
+    vulns = []
     if sqli:
         cvss, cost = calculate_dynamic_risk("SQL Injection", "Critical")
-        report["vulnerabilities"].append({
+        vulns.append({
             "type": "SQL Injection", "details": sqli, "severity": "Critical",
             "fix": """# SQL INJECTION PATCH\n# ⛔ CRITICAL: Raw query concatenation detected.\n\n# VULNERABLE CODE:\n# query = "SELECT * FROM users WHERE id = " + user_input\n\n# SECURE PATCH (Parameterized Queries):\n# Python: cursor.execute("SELECT * FROM users WHERE id = %s", (user_input,))\n# Node.js: db.query('SELECT * FROM users WHERE id = $1', [user_input])""", 
             "cvss": cvss, "est_cost": cost
         })
+    return vulns
 
-    # 4. REGEX XSS SCAN
-    xss = scan_xss(target_url)
+# 4. REGEX XSS SCAN
+def format_xss(xss):
+    vulns = []
     if xss:
         cvss, cost = calculate_dynamic_risk("XSS", "High")
-        report["vulnerabilities"].append({
+        vulns.append({
             "type": "XSS", "details": xss, "severity": "High",
             "fix": """# XSS DEFENSE PROTOCOL\n# ---------------------------------------------------\n# 1. INPUT VALIDATION:\n# Reject inputs containing <script>, <iframe>, or 'javascript:'\n\n# 2. OUTPUT ENCODING:\n# Use libraries like DOMPurify before rendering HTML.\n# clean = DOMPurify.sanitize(dirty);\n\n# 3. ENABLE CSP HEADER:\n# Content-Security-Policy: default-src 'self'; script-src 'self' https://trusted.cdn.com;""", 
             "cvss": cvss, "est_cost": cost
         })
+    return vulns
 
-    # 5. REGEX SHADOW API SCAN
-    shadows = scan_shadow_apis(target_url)
-    for s in shadows:
+# 5. REGEX SHADOW API SCAN
+def format_shadow_apis(shadows):
+    vulns = []
+    for s in shadows or []:
         cvss, cost = calculate_dynamic_risk("Shadow API Detected", "Medium")
-        report["vulnerabilities"].append({
+        vulns.append({
             "type": "Shadow API Detected", "details": s, "severity": "Medium",
             "fix": """# API HARDENING\n# ---------------------------------------------------\n# 1. AUTHENTICATION:\n# Ensure this endpoint requires a valid JWT/OAuth2 token.\n\n# 2. RATE LIMITING (Nginx Example):\n# limit_req_zone $binary_remote_addr zone=mylimit:10m rate=10r/s;\n\n# 3. SWAGGER DOCUMENTATION:\n# Register this endpoint in openapi.yaml to ensure visibility.""", 
             "cvss": cvss, "est_cost": cost
         })
+    return vulns
+
+# Merge order of the report; modules finish in any order
+QUICK_SCAN_MODULES = [
+    # name, module, needs page cache, formatter
+    ("pii", scan_page_content, True, format_pii),
+    ("ports", scan_ports, False, format_ports),
+    ("sqli", scan_sql_injection, True, format_sqli),
+    ("xss", scan_xss, True, format_xss),
+    ("shadow_apis", scan_shadow_apis, True, format_shadow_apis),
+]
+
+# On incremental rescans these re-run only when the fingerprint of the page
+# changes; everything else is cheap once the page itself is known unchanged
+INCREMENTAL_FINGERPRINTS = {
+    "sqli": lambda doc: forms_fingerprint(doc.forms),
+    "xss": lambda doc: forms_fingerprint(doc.forms),
+}
+
+# --- QUICK SCAN LOGIC ---
+@profiling.profiled("quick_scan")
+@telemetry.track_scan("quick")
+def perform_quick_scan(target_url, on_event=None, crawl=False, incremental=False):
+    """
+    on_event(event, data), when given, receives each module's findings as
+    soon as that module finishes, then the summary once all are merged.
+    With crawl=True the page modules run on every same-origin page the
+    crawler finds, starting on each page as soon as it is fetched.
+    With incremental=True, pages are fetched conditionally against the last
+    scan and the active payload modules only re-run where forms changed.
+    """
+    report = {
+        "target": target_url,
+        "vulnerabilities": [],
+        "summary": {"high": 0, "medium": 0, "low": 0},
+        "financial_risk_total": 0
+    }
+
+    print(f"[*] Running Quick Scan for {target_url}...")
+    emit = on_event or (lambda event, data: None)
+
+    # Modules are independent, so run them side by side. Findings are still
+    # merged below in a fixed order, keeping reports stable between runs.
+    # The page cache lets them share one download and parse of each page.
+    state = get_scan_state() if incremental else None
+    cache = PageCache(state=state)
+    scan = telemetry.current_scan()
+    formatters = {name: formatter for name, _, _, formatter in QUICK_SCAN_MODULES}
+    modules = {name: module for name, module, _, _ in QUICK_SCAN_MODULES}
+    if state is not None:
+        for name, fingerprint_of in INCREMENTAL_FINGERPRINTS.items():
+            modules[name] = reuse_result(state, name, modules[name], fingerprint_of)
+    modules = {name: scan.timed(name, module) for name, module in modules.items()}
+    formatted = {}
+
+    def module_done(key, result):
+        name = key[0] if isinstance(key, tuple) else key
+        formatted[key] = formatters[name](result)
+        scan.add_findings(name, len(formatted[key]))
+        for vuln in formatted[key]:
+            emit("finding", vuln)
+        phase = {"phase": name, "status": "complete", "findings": len(formatted[key])}
+        if isinstance(key, tuple):
+            phase["page"] = key[1]
+        emit("phase", phase)
+
+    if not crawl:
+        run_concurrently([
+            (name, modules[name], (target_url, cache) if uses_cache else (target_url,))
+            for name, _, uses_cache, _ in QUICK_SCAN_MODULES
+        ], on_result=module_done)
+        for name, _, _, _ in QUICK_SCAN_MODULES:
+            report["vulnerabilities"].extend(formatted.get(name, []))
+    else:
+        # Site-wide modules run once; page modules once per crawled page
+        batch = ModuleBatch(on_result=module_done)
+        for name, _, uses_cache, _ in QUICK_SCAN_MODULES:
+            if not uses_cache:
+                batch.submit(name, modules[name], target_url)
+        pages = 0
+        with scan.phase("crawl"):
+            for page in crawl_site(target_url, cache):
+                pages += 1
+                emit("page", {"url": page.url, "depth": page.depth,
+                              "forms": len(page.doc.forms), "scripts": len(page.doc.scripts)})
+                for name, _, uses_cache, _ in QUICK_SCAN_MODULES:
+                    if uses_cache:
+                        batch.submit((name, page.index), modules[name], page.url, cache)
+        batch.join()
+        report["pages_scanned"] = pages
+
+        # Module order first, then page discovery order. The same finding
+        # (e.g. a shared script's endpoints) is only reported once.
+        seen = set()
+        for name, _, _, _ in QUICK_SCAN_MODULES:
+            keys = sorted((k for k in formatted if k == name or (isinstance(k, tuple) and k[0] == name)),
+                          key=lambda k: k[1] if isinstance(k, tuple) else -1)
+            for key in keys:
+                for vuln in formatted[key]:
+                    if (vuln["type"], vuln["details"]) not in seen:
+                        seen.add((vuln["type"], vuln["details"]))
+                        report["vulnerabilities"].append(vuln)
 
     # CALCULATE TOTALS
     for vuln in report["vulnerabilities"]:
@@ -194,7 +598,14 @@ def perform_quick_scan(target_url):
         elif sev == "Medium": report["summary"]["medium"] += 1
         elif sev == "Low": report["summary"]["low"] += 1
 
+    report["timings"] = scan.timings()
+    emit("summary", {"target": target_url, "summary": report["summary"],
+                     "vulnerabilities_found": len(report["vulnerabilities"]),
+                     "financial_risk_total": report["financial_risk_total"]})
     return report
 
 if __name__ == '__main__':
+    # The reloader's parent only watches files; the child it starts serves
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        warm_up()
     app.run(debug=True, port=5000)
\ No newline at end of file
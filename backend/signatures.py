@@ -0,0 +1,67 @@
+import json
+import os
+import re
+
+# --- CONFIG: SIGNATURE DATABASE ---
+SIGNATURES_FILE = os.environ.get("SENTINEL_SIGNATURES", os.path.join(os.path.dirname(os.path.abspath(__file__)), "signatures.json"))
+
+class Signature:
+    def __init__(self, name, pattern, case_sensitive=False):
+        self.name = name
+        self.pattern = pattern
+        self.case_sensitive = case_sensitive
+
+class Match:
+    def __init__(self, signature, text):
+        self.signature = signature
+        self.name = signature.name
+        self.text = text  # the exact bytes/str that matched
+
+class SignatureMatcher:
+    """
+    Compiles every signature into one alternation, so a body is scanned once
+    no matter how many signatures are loaded. Works on bytes (preferred: no
+    decode, no lowercase copy) or str.
+    """
+    def __init__(self, signatures):
+        self.signatures = list(signatures)
+        alternatives = []
+        for i, sig in enumerate(self.signatures):
+            literal = re.escape(sig.pattern)
+            alternatives.append(f"(?P<s{i}>(?-i:{literal}))" if sig.case_sensitive else f"(?P<s{i}>{literal})")
+        source = "|".join(alternatives) or "(?!)"
+        self._text_re = re.compile(source, re.IGNORECASE)
+        self._bytes_re = re.compile(source.encode("utf-8"), re.IGNORECASE)
+
+    def search(self, body):
+        """Returns the earliest Match in body, or None."""
+        if not body:
+            return None
+        regex = self._bytes_re if isinstance(body, (bytes, bytearray)) else self._text_re
+        m = regex.search(body)
+        if m is None:
+            return None
+        return Match(self.signatures[int(m.lastgroup[1:])], m.group())
+
+def load_signatures(path=SIGNATURES_FILE):
+    """Returns {group: [Signature, ...]} from the JSON signature database."""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    groups = {}
+    for group, entries in data.items():
+        groups[group] = [
+            Signature(entry["name"], pattern, entry.get("case_sensitive", False))
+            for entry in entries for pattern in entry["patterns"]
+        ]
+    return groups
+
+_groups = load_signatures()
+
+def build_matcher(*group_names):
+    return SignatureMatcher(sig for name in group_names for sig in _groups.get(name, []))
+
+DB_ERRORS = build_matcher("db_errors")
+# The browser fuzzer has always also flagged generic words like "warning"
+DB_ERRORS_DEEP = build_matcher("db_errors", "db_errors_broad")
+REFLECTIONS = build_matcher("reflections")
+STORAGE_SECRETS = build_matcher("storage_secrets")
@@ -0,0 +1,179 @@
+import base64
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+
+# --- CONFIG: SCAN HISTORY STORAGE ---
+SQLITE_PATH = os.environ.get("SENTINEL_HISTORY_DB", "scan_history.db")
+PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+SUMMARY_FIELDS = ("id", "user_id", "target_url", "scan_mode", "risk_score", "vulnerabilities_found", "created_at")
+
+def encode_cursor(created_at, scan_id):
+    return base64.urlsafe_b64encode(json.dumps([created_at, scan_id]).encode()).decode()
+
+def decode_cursor(cursor):
+    """Returns (created_at, id) from an opaque cursor; raises ValueError if it's malformed."""
+    try:
+        created_at, scan_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except Exception:
+        raise ValueError("invalid cursor")
+    return created_at, scan_id
+
+def _iso_timestamp(value):
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value, timezone.utc).isoformat()
+    return value
+
+class Storage:
+    """
+    Where scan_history rows live. Rows are dicts with user_id, target_url,
+    scan_mode, risk_score, vulnerabilities_found and report_json. Listings
+    are newest first and paginated by an opaque cursor.
+    """
+    def insert_many(self, rows):
+        raise NotImplementedError
+
+    def list_scans(self, user_id, limit=PAGE_SIZE, cursor=None, target_url=None):
+        """Returns (summaries without report_json, next cursor or None)."""
+        raise NotImplementedError
+
+    def get_scan(self, user_id, scan_id):
+        """Returns the full row including report_json, or None."""
+        raise NotImplementedError
+
+class SQLiteStorage(Storage):
+    """Self-hosted history: WAL-mode SQLite, report_json stored zlib-compressed."""
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS scan_history (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id TEXT NOT NULL,
+        target_url TEXT NOT NULL,
+        scan_mode TEXT,
+        risk_score INTEGER,
+        vulnerabilities_found INTEGER,
+        report_json BLOB,
+        created_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS scan_history_user_created ON scan_history (user_id, created_at);
+    CREATE INDEX IF NOT EXISTS scan_history_target_created ON scan_history (target_url, created_at);
+    """
+
+    def __init__(self, path=SQLITE_PATH):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")  # safe under WAL, one fsync per checkpoint
+        self._conn.executescript(self.SCHEMA)
+        self._lock = threading.Lock()
+
+    def insert_many(self, rows):
+        now = time.time()
+        records = [(
+            row["user_id"], row["target_url"], row.get("scan_mode"), row.get("risk_score"),
+            row.get("vulnerabilities_found"),
+            zlib.compress(json.dumps(row.get("report_json"), default=str).encode()),
+            row.get("created_at") or now,
+        ) for row in rows]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO scan_history (user_id, target_url, scan_mode, risk_score, vulnerabilities_found, report_json, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)", records)
+
+    def list_scans(self, user_id, limit=PAGE_SIZE, cursor=None, target_url=None):
+        # Keyset pagination: (created_at, id) is strictly decreasing down the
+        # index, so every page costs the same no matter how deep it is
+        sql = f"SELECT {', '.join(SUMMARY_FIELDS)} FROM scan_history WHERE user_id = ?"
+        params = [user_id]
+        if target_url:
+            sql += " AND target_url = ?"
+            params.append(target_url)
+        if cursor:
+            sql += " AND (created_at, id) < (?, ?)"
+            params.extend(decode_cursor(cursor))
+        sql += " ORDER BY created_at DESC, id DESC LIMIT ?"
+        params.append(limit + 1)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        scans = [dict(zip(SUMMARY_FIELDS, row)) for row in rows[:limit]]
+        next_cursor = encode_cursor(scans[-1]["created_at"], scans[-1]["id"]) if len(rows) > limit else None
+        return scans, next_cursor
+
+    def get_scan(self, user_id, scan_id):
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(SUMMARY_FIELDS)}, report_json FROM scan_history WHERE id = ? AND user_id = ?",
+                (scan_id, user_id)).fetchone()
+        if row is None:
+            return None
+        scan = dict(zip(SUMMARY_FIELDS, row[:-1]))
+        scan["report_json"] = json.loads(zlib.decompress(row[-1])) if row[-1] else None
+        return scan
+
+class SupabaseStorage(Storage):
+    """The hosted scan_history table."""
+    def __init__(self, client, table="scan_history"):
+        self.client = client
+        self.table = table
+
+    def insert_many(self, rows):
+        # created_at is a timestamptz column here; queued rows carry epoch seconds
+        rows = [{**row, "created_at": _iso_timestamp(row["created_at"])} if row.get("created_at") else row
+                for row in rows]
+        self.client.table(self.table).insert(rows).execute()
+
+    def list_scans(self, user_id, limit=PAGE_SIZE, cursor=None, target_url=None):
+        query = self.client.table(self.table).select(",".join(SUMMARY_FIELDS)).eq("user_id", user_id)
+        if target_url:
+            query = query.eq("target_url", target_url)
+        if cursor:
+            created_at, scan_id = decode_cursor(cursor)
+            query = query.or_(f"created_at.lt.{created_at},and(created_at.eq.{created_at},id.lt.{scan_id})")
+        rows = query.order("created_at", desc=True).order("id", desc=True).limit(limit + 1).execute().data
+        scans = rows[:limit]
+        next_cursor = encode_cursor(scans[-1]["created_at"], scans[-1]["id"]) if len(rows) > limit else None
+        return scans, next_cursor
+
+    def get_scan(self, user_id, scan_id):
+        rows = self.client.table(self.table).select("*").eq("id", scan_id).eq("user_id", user_id).limit(1).execute().data
+        return rows[0] if rows else None
+
+class MemoryStorage(Storage):
+    """
+    In-process stand-in for local runs and tests (SUPABASE_URL=memory:// or
+    SENTINEL_STORAGE=memory). Set .fail to simulate an outage.
+    """
+    def __init__(self):
+        self.rows = []
+        self.fail = False
+        self._lock = threading.Lock()
+
+    def insert_many(self, rows):
+        if self.fail:
+            raise ConnectionError("memory storage is set to fail")
+        with self._lock:
+            for row in rows:
+                self.rows.append({**row, "id": len(self.rows) + 1, "created_at": row.get("created_at") or time.time()})
+
+    def list_scans(self, user_id, limit=PAGE_SIZE, cursor=None, target_url=None):
+        with self._lock:
+            rows = [r for r in self.rows if r["user_id"] == user_id and (not target_url or r["target_url"] == target_url)]
+        rows.sort(key=lambda r: (r["created_at"], r["id"]), reverse=True)
+        if cursor:
+            position = tuple(decode_cursor(cursor))
+            rows = [r for r in rows if (r["created_at"], r["id"]) < position]
+        scans = [{field: r.get(field) for field in SUMMARY_FIELDS} for r in rows[:limit]]
+        next_cursor = encode_cursor(scans[-1]["created_at"], scans[-1]["id"]) if len(rows) > limit else None
+        return scans, next_cursor
+
+    def get_scan(self, user_id, scan_id):
+        with self._lock:
+            for row in self.rows:
+                if row["id"] == scan_id and row["user_id"] == user_id:
+                    return dict(row)
+        return None
@@ -0,0 +1,267 @@
+import contextvars
+import functools
+import threading
+import time
+from scan_executor import ScanCancelled
+
+# --- CONFIG: METRIC BUCKETS ---
+PHASE_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 60, 120, 300)
+SCAN_BUCKETS = (0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300, 600, 1800)
+
+# --- PROCESS METRICS (Prometheus text exposition) ---
+class _Metric:
+    def __init__(self, name, help_text, kind, labels=()):
+        self.name = name
+        self.help = help_text
+        self.kind = kind
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _key(self, labels):
+        return tuple(str(labels.get(label, "")) for label in self.labels)
+
+    def samples(self):
+        """Yields (suffix, labels dict, value)."""
+        with self._lock:
+            values = dict(self._values)
+        for key, value in sorted(values.items()):
+            yield "", dict(zip(self.labels, key)), value
+
+class Counter(_Metric):
+    def __init__(self, name, help_text, labels=()):
+        super().__init__(name, help_text, "counter", labels)
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+class Histogram(_Metric):
+    def __init__(self, name, help_text, labels=(), buckets=PHASE_BUCKETS):
+        super().__init__(name, help_text, "histogram", labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts = self._values.get(key)
+            if counts is None:
+                # one slot per bucket, then sum and count
+                counts = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            counts[-2] += value
+            counts[-1] += 1
+
+    def samples(self):
+        with self._lock:
+            values = {key: list(counts) for key, counts in self._values.items()}
+        for key, counts in sorted(values.items()):
+            labels = dict(zip(self.labels, key))
+            for bound, count in zip(self.buckets, counts):
+                yield "_bucket", {**labels, "le": _number(bound)}, count
+            yield "_bucket", {**labels, "le": "+Inf"}, counts[-1]
+            yield "_sum", labels, counts[-2]
+            yield "_count", labels, counts[-1]
+
+class Gauge(_Metric):
+    """
+    Read at scrape time from collect(), which returns a number or a
+    {label value tuple: number} dict, so gauges never go stale.
+    """
+    def __init__(self, name, help_text, collect, labels=()):
+        super().__init__(name, help_text, "gauge", labels)
+        self.collect = collect
+
+    def samples(self):
+        try:
+            values = self.collect()
+        except Exception as e:
+            print(f"[!] Gauge {self.name} failed: {e}")
+            return
+        if not isinstance(values, dict):
+            values = {(): values}
+        for key, value in sorted(values.items()):
+            key = key if isinstance(key, tuple) else (key,)
+            yield "", dict(zip(self.labels, key)), value
+
+_registry = []
+
+def _number(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def render():
+    """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+    lines = []
+    for metric in _registry:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for suffix, labels, value in metric.samples():
+            label_text = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+            lines.append(f"{metric.name}{suffix}{{{label_text}}} {_number(value)}" if label_text
+                         else f"{metric.name}{suffix} {_number(value)}")
+    return "\n".join(lines) + "\n"
+
+SCANS = Counter("sentinel_scans_total", "Scans finished, by mode and outcome.", ("mode", "status"))
+SCAN_SECONDS = Histogram("sentinel_scan_duration_seconds", "Wall time of whole scans.", ("mode",), SCAN_BUCKETS)
+PHASE_SECONDS = Histogram("sentinel_phase_duration_seconds", "Wall time of one scan phase or module call.", ("mode", "phase"))
+PHASE_REQUESTS = Counter("sentinel_phase_requests_total", "HTTP requests sent by scan phases.", ("mode", "phase"))
+PHASE_BYTES = Counter("sentinel_phase_response_bytes_total", "Response body bytes received by scan phases.", ("mode", "phase"))
+PHASE_ERRORS = Counter("sentinel_phase_errors_total", "Failed requests and crashed module calls, by phase.", ("mode", "phase"))
+PHASE_FINDINGS = Counter("sentinel_phase_findings_total", "Findings reported by scan phases.", ("mode", "phase"))
+
+_active = {}
+_active_lock = threading.Lock()
+
+def _active_scans():
+    with _active_lock:
+        return {(mode,): count for mode, count in _active.items()}
+
+ACTIVE_SCANS = Gauge("sentinel_active_scans", "Scans running right now.", _active_scans, ("mode",))
+
+# --- PER-SCAN TELEMETRY ---
+_current_scan = contextvars.ContextVar("sentinel_scan", default=None)
+_current_phase = contextvars.ContextVar("sentinel_phase", default=None)
+
+class PhaseStats:
+    """What one phase of one scan cost. Updated from any worker thread."""
+    def __init__(self, mode, name):
+        self.mode = mode
+        self.name = name
+        self.seconds = 0.0
+        self.calls = 0
+        self.requests = 0
+        self.bytes = 0
+        self.errors = 0
+        self.findings = 0
+        self._lock = threading.Lock()
+
+    def add(self, requests=0, bytes_read=0, errors=0, findings=0):
+        with self._lock:
+            self.requests += requests
+            self.bytes += bytes_read
+            self.errors += errors
+            self.findings += findings
+        labels = {"mode": self.mode, "phase": self.name}
+        if requests: PHASE_REQUESTS.inc(requests, **labels)
+        if bytes_read: PHASE_BYTES.inc(bytes_read, **labels)
+        if errors: PHASE_ERRORS.inc(errors, **labels)
+        if findings: PHASE_FINDINGS.inc(findings, **labels)
+
+    def to_dict(self):
+        with self._lock:
+            return {"seconds": round(self.seconds, 3), "calls": self.calls, "requests": self.requests,
+                    "bytes": self.bytes, "errors": self.errors, "findings": self.findings}
+
+class ScanTelemetry:
+    """
+    Timings and traffic for one scan, split by phase. Work done inside
+    phase() is attributed to it, including on worker threads that were
+    handed the caller's context (see contextvars.copy_context).
+    """
+    def __init__(self, mode):
+        self.mode = mode
+        self.started = time.monotonic()
+        self.phases = {}
+        self._lock = threading.Lock()
+
+    def stats(self, name):
+        with self._lock:
+            stats = self.phases.get(name)
+            if stats is None:
+                stats = self.phases[name] = PhaseStats(self.mode, name)
+            return stats
+
+    def phase(self, name):
+        return _PhaseTimer(self.stats(name))
+
+    def timed(self, name, func):
+        """Wraps func so every call runs as (one call of) phase `name`."""
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with self.phase(name):
+                return func(*args, **kwargs)
+        return wrapper
+
+    def add_findings(self, name, count):
+        self.stats(name).add(findings=count)
+
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    def timings(self):
+        """The report's `timings` block. Phase seconds add up concurrent calls."""
+        with self._lock:
+            phases = list(self.phases.values())
+        return {"total_seconds": round(self.elapsed(), 3),
+                "phases": {stats.name: stats.to_dict() for stats in phases}}
+
+class _PhaseTimer:
+    def __init__(self, stats):
+        self.stats = stats
+
+    def __enter__(self):
+        self._token = _current_phase.set(self.stats)
+        self._started = time.monotonic()
+        return self.stats
+
+    def __exit__(self, exc_type, exc, tb):
+        took = time.monotonic() - self._started
+        _current_phase.reset(self._token)
+        with self.stats._lock:
+            self.stats.seconds += took
+            self.stats.calls += 1
+        PHASE_SECONDS.observe(took, mode=self.stats.mode, phase=self.stats.name)
+        if exc_type is not None and not issubclass(exc_type, ScanCancelled):
+            self.stats.add(errors=1)
+
+def track_scan(mode):
+    """
+    Decorator for scan entry points: counts the scan as active while it
+    runs and records its outcome and duration. Inside, current_scan() is
+    this scan's ScanTelemetry.
+    """
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            scan = ScanTelemetry(mode)
+            token = _current_scan.set(scan)
+            with _active_lock:
+                _active[mode] = _active.get(mode, 0) + 1
+            status = "failed"
+            try:
+                result = func(*args, **kwargs)
+                status = "done"
+                return result
+            except ScanCancelled:
+                status = "cancelled"
+                raise
+            finally:
+                with _active_lock:
+                    _active[mode] -= 1
+                _current_scan.reset(token)
+                SCANS.inc(mode=mode, status=status)
+                SCAN_SECONDS.observe(scan.elapsed(), mode=mode)
+        return wrapper
+    return decorate
+
+def current_scan():
+    """The running scan's ScanTelemetry; a throwaway one outside track_scan."""
+    return _current_scan.get() or ScanTelemetry("untracked")
+
+def current_phase():
+    return _current_phase.get()
+
+def record_request(bytes_read=0, error=False, phase=None):
+    """Counts one request against `phase`, or the phase of the calling context."""
+    phase = phase or _current_phase.get()
+    if phase is not None:
+        phase.add(requests=1, bytes_read=bytes_read, errors=int(error))
@@ -0,0 +1,13 @@
+"""
+Production entry point:
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+`python server.py` stays the single-process debug server for development.
+"""
+import os
+
+# Deep scans and the browsers they drive get their own processes in production
+os.environ.setdefault("SENTINEL_DEEP_PROCESSES", "2")
+
+from server import app, begin_shutdown, shutdown, warm_up  # noqa: E402,F401
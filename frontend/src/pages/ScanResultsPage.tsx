@@ -78,6 +78,7 @@ export default function ScanResultsPage() {
     ];
 
     const timeouts: NodeJS.Timeout[] = [];
+    let cancelled = false;
     let delay = 0;
 
     logs.forEach((log) => {
@@ -103,11 +104,26 @@ export default function ScanResultsPage() {
             url, 
             user_id: userId 
         });
+
+        // Deep scans run as background jobs: poll until the report is ready
+        let reportData = response.data;
+        if (mode === 'deep') {
+            const jobId = response.data.job_id;
+            while (!cancelled) {
+                await new Promise(resolve => setTimeout(resolve, 2000));
+                const result = await axios.get(`${API_BASE_URL}/api/jobs/${jobId}/result`);
+                if (result.status === 200) {
+                    reportData = result.data;
+                    break;
+                }
+            }
+            if (cancelled) return;
+        }
         
         const waitTime = mode === 'deep' ? 1000 : 7500; 
         
         const finalDelay = setTimeout(() => {
-            setReport(response.data);
+            setReport(reportData);
             setLoading(false);
         }, waitTime);
         timeouts.push(finalDelay);
@@ -121,7 +137,10 @@ export default function ScanResultsPage() {
 
     fetchScan();
 
-    return () => timeouts.forEach(clearTimeout);
+    return () => {
+      cancelled = true;
+      timeouts.forEach(clearTimeout);
+    };
   }, [url, navigate, mode]);
 
   // ... (Keep the rest of your component: handleDownload, getDoughnutData, calculateCompliance, etc.)